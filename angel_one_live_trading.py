@@ -10,7 +10,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 import time
 import json
-from ema_algo_trading import EMAStrategy
+from ema_algo_trading import EMAStrategy, sleep_until_next_candle
 
 
 class AngelOneTrading:
@@ -415,7 +415,7 @@ def run_live_trading_angel_one(api_key, client_code, password, totp_secret,
             # Avoid choppy mid-day period
             if 11 <= current_time.hour < 14:
                 print("Mid-day period - low volume. Skipping...")
-                time.sleep(300)
+                sleep_until_next_candle(300)
                 continue
             
             # Fetch latest data
@@ -432,7 +432,7 @@ def run_live_trading_angel_one(api_key, client_code, password, totp_secret,
             
             if data is None or len(data) < 30:
                 print("Insufficient data. Waiting...")
-                time.sleep(300)
+                sleep_until_next_candle(300)
                 continue
             
             # Check exit conditions first
@@ -544,7 +544,7 @@ def run_live_trading_angel_one(api_key, client_code, password, totp_secret,
             
             # Wait for next candle (5 minutes)
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Waiting for next candle...")
-            time.sleep(300)
+            sleep_until_next_candle(300)
             
     except KeyboardInterrupt:
         print("\n\nStopping live trading...")
@@ -14,6 +14,7 @@ from backtest_engine import BacktestEngine
 from paper_trading import PaperTradingSimulator
 from ema_algo_trading import EMAStrategy
 from bot_runner import BotRunner
+from ui_helpers import show_equity_curve, plotly_chart_cached, DISPLAY_COLS, DISPLAY_FORMAT
 import time
 import threading
 
@@ -567,47 +568,13 @@ class TradingBotApp:
             closed_trades = trades[trades['status'] == 'CLOSED'].head(20)
 
             if len(closed_trades) > 0:
-                display_columns = ['timestamp', 'symbol', 'signal_type', 'entry_price',
-                                  'exit_price', 'pnl', 'pnl_percent', 'reason']
-
                 st.dataframe(
-                    closed_trades[display_columns].style.format({
-                        'entry_price': '₹{:.2f}',
-                        'exit_price': '₹{:.2f}',
-                        'pnl': '₹{:.2f}',
-                        'pnl_percent': '{:+.2f}%'
-                    }),
+                    closed_trades.reindex(columns=DISPLAY_COLS).style.format(DISPLAY_FORMAT),
                     use_container_width=True
                 )
 
                 # Equity curve
-                st.subheader("Equity Curve")
-
-                closed_trades = closed_trades.sort_values('exit_time')
-                closed_trades['cumulative_pnl'] = closed_trades['pnl'].cumsum()
-                closed_trades['equity'] = 10000 + closed_trades['cumulative_pnl']
-
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=closed_trades['exit_time'],
-                    y=closed_trades['equity'],
-                    mode='lines+markers',
-                    name='Equity',
-                    line=dict(color='blue', width=2)
-                ))
-
-                fig.add_hline(y=10000, line_dash="dash", line_color="gray",
-                             annotation_text="Initial Capital")
-
-                fig.update_layout(
-                    title="Account Equity Over Time",
-                    xaxis_title="Date",
-                    yaxis_title="Equity (₹)",
-                    hovermode='x unified',
-                    height=400
-                )
-
-                st.plotly_chart(fig, use_container_width=True)
+                show_equity_curve(self.db, mode)
             else:
                 st.info("No closed trades yet")
         else:
@@ -916,17 +883,20 @@ class TradingBotApp:
                             # Plot equity curve
                             st.subheader("Equity Curve")
 
-                            equity_df = pd.DataFrame({
-                                'Trade': range(len(engine.equity_curve)),
-                                'Equity': engine.equity_curve
-                            })
+                            def build_equity_figure():
+                                equity_df = pd.DataFrame({
+                                    'Trade': range(len(engine.equity_curve)),
+                                    'Equity': engine.equity_curve
+                                })
 
-                            fig = px.line(equity_df, x='Trade', y='Equity',
-                                        title='Equity Curve')
-                            fig.add_hline(y=capital, line_dash="dash",
-                                        line_color="gray")
+                                fig = px.line(equity_df, x='Trade', y='Equity',
+                                            title='Equity Curve')
+                                fig.add_hline(y=capital, line_dash="dash",
+                                            line_color="gray")
+                                return fig
 
-                            st.plotly_chart(fig, use_container_width=True)
+                            plotly_chart_cached('equity_fig_backtest_run', engine.equity_curve,
+                                                build_equity_figure, capital)
 
             except Exception as e:
                 st.error(f"Error loading data: {str(e)}")
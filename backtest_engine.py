@@ -10,6 +10,14 @@ from ema_algo_trading import EMAStrategy
 from database_handler import TradingDatabase
 import matplotlib.pyplot as plt
 
+# pyarrow's multithreaded CSV reader loads large historical files several
+# times faster than pandas' default C parser
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
 
 class BacktestEngine:
     def __init__(self, initial_capital=10000, risk_per_trade=0.02):
@@ -60,116 +68,84 @@ class BacktestEngine:
         self.trades = []
         self.equity_curve = [self.initial_capital]
         
-        # Track current trade
-        current_trade = None
-        
-        # Iterate through data
-        for i in range(30, len(data)):
-            current_data = data.iloc[:i+1].copy()
-            current_candle = data.iloc[i]
+        # Step through every bar in the compiled core, then replay its trades
+        arrays = self.strategy.precompute_indicators(data)
+        result = self.strategy.simulate(arrays)
+        timestamps = data['timestamp'].tolist()
+        close = arrays.close
+        
+        for k in range(len(result['entry_bar'])):
+            entry_bar = result['entry_bar'][k]
+            exit_bar = result['exit_bar'][k]
+            signal = self.strategy._SIGNALS[result['direction'][k]]
+            entry_price = close[entry_bar]
+            quantity = int(result['quantity'][k])
+            stop_loss = result['stop_loss'][k]
+            target = result['target'][k]
+            
+            # Update strategy state
+            self.strategy.position = 'LONG' if signal == 'BUY' else 'SHORT'
+            self.strategy.entry_price = entry_price
+            self.strategy.stop_loss = stop_loss
+            self.strategy.target = target
             
-            # Check exit conditions first
-            if self.strategy.position:
-                should_exit = self.strategy.check_exit_conditions(current_data)
-                
-                if should_exit:
-                    # Exit trade
-                    exit_price = current_candle['close']
-                    entry_price = current_trade['entry_price']
-                    quantity = current_trade['quantity']
-                    
-                    # Calculate P&L
-                    if current_trade['signal_type'] == 'BUY':
-                        pnl = (exit_price - entry_price) * quantity
-                    else:
-                        pnl = (entry_price - exit_price) * quantity
-                    
-                    pnl_percent = (pnl / (entry_price * quantity)) * 100
-                    
-                    # Update capital
-                    self.capital += pnl
-                    
-                    # Record trade
-                    trade_record = {
-                        'trade_id': f"BT_{i}",
-                        'symbol': symbol,
-                        'exchange': exchange,
-                        'signal_type': current_trade['signal_type'],
-                        'entry_time': current_trade['entry_time'],
-                        'exit_time': current_candle['timestamp'],
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'quantity': quantity,
-                        'stop_loss': current_trade['stop_loss'],
-                        'target': current_trade['target'],
-                        'pnl': pnl,
-                        'pnl_percent': pnl_percent,
-                        'status': 'CLOSED',
-                        'mode': 'backtest'
-                    }
-                    
-                    self.trades.append(trade_record)
-                    
-                    # Save to database
-                    self.db.insert_trade(trade_record)
-                    
-                    # Print trade
-                    print(f"[{current_candle['timestamp']}] EXIT: {current_trade['signal_type']}")
-                    print(f"  Entry: ₹{entry_price:.2f} | Exit: ₹{exit_price:.2f}")
-                    print(f"  P&L: ₹{pnl:.2f} ({pnl_percent:+.2f}%)")
-                    print(f"  Capital: ₹{self.capital:,.2f}\n")
-                    
-                    # Reset
-                    current_trade = None
-                    self.strategy.position = None
+            print(f"[{timestamps[entry_bar]}] ENTRY: {signal}")
+            print(f"  Entry: ₹{entry_price:.2f} | Quantity: {quantity}")
+            print(f"  Stop Loss: ₹{stop_loss:.2f} | Target: ₹{target:.2f}\n")
             
-            # Generate new signals if no position
-            if self.strategy.position is None:
-                signal = self.strategy.generate_signal(current_data)
-                
-                if signal:
-                    current_price = current_candle['close']
-                    stop_loss, target = self.strategy.calculate_stop_loss_target(current_data, signal)
-                    quantity = self.strategy.calculate_position_size(current_price, stop_loss)
-                    
-                    if quantity > 0:
-                        # Enter trade
-                        current_trade = {
-                            'signal_type': signal,
-                            'entry_time': current_candle['timestamp'],
-                            'entry_price': current_price,
-                            'quantity': quantity,
-                            'stop_loss': stop_loss,
-                            'target': target
-                        }
-                        
-                        # Update strategy state
-                        self.strategy.position = 'LONG' if signal == 'BUY' else 'SHORT'
-                        self.strategy.entry_price = current_price
-                        self.strategy.stop_loss = stop_loss
-                        self.strategy.target = target
-                        
-                        print(f"[{current_candle['timestamp']}] ENTRY: {signal}")
-                        print(f"  Entry: ₹{current_price:.2f} | Quantity: {quantity}")
-                        print(f"  Stop Loss: ₹{stop_loss:.2f} | Target: ₹{target:.2f}\n")
+            if exit_bar < 0:
+                # Still open at the end of the data
+                break
             
-            # Update equity curve
-            if self.strategy.position:
-                # Mark-to-market
-                current_price = current_candle['close']
-                entry_price = current_trade['entry_price']
-                quantity = current_trade['quantity']
-                
-                if current_trade['signal_type'] == 'BUY':
-                    unrealized_pnl = (current_price - entry_price) * quantity
-                else:
-                    unrealized_pnl = (entry_price - current_price) * quantity
-                
-                equity = self.capital + unrealized_pnl
+            exit_price = close[exit_bar]
+            self.strategy.announce_exit(result['exit_reason'][k], exit_price)
+            
+            # Calculate P&L
+            if signal == 'BUY':
+                pnl = (exit_price - entry_price) * quantity
             else:
-                equity = self.capital
+                pnl = (entry_price - exit_price) * quantity
+            
+            pnl_percent = (pnl / (entry_price * quantity)) * 100
+            
+            # Update capital
+            self.capital += pnl
             
-            self.equity_curve.append(equity)
+            # Record trade
+            trade_record = {
+                'trade_id': f"BT_{exit_bar}",
+                'symbol': symbol,
+                'exchange': exchange,
+                'signal_type': signal,
+                'entry_time': timestamps[entry_bar],
+                'exit_time': timestamps[exit_bar],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'stop_loss': stop_loss,
+                'target': target,
+                'pnl': pnl,
+                'pnl_percent': pnl_percent,
+                'status': 'CLOSED',
+                'mode': 'backtest'
+            }
+            
+            self.trades.append(trade_record)
+            
+            # Print trade
+            print(f"[{timestamps[exit_bar]}] EXIT: {signal}")
+            print(f"  Entry: ₹{entry_price:.2f} | Exit: ₹{exit_price:.2f}")
+            print(f"  P&L: ₹{pnl:.2f} ({pnl_percent:+.2f}%)")
+            print(f"  Capital: ₹{self.capital:,.2f}\n")
+            
+            self.strategy.position = None
+        
+        # Save every closed trade to the database in one transaction
+        if self.trades:
+            self.db.insert_trades(self.trades)
+        
+        # Equity per bar, including mark-to-market of the open position
+        self.equity_curve.extend(result['equity'][30:].tolist())
         
         # Calculate results
         results = self.calculate_results()
@@ -317,7 +293,7 @@ def load_historical_data(csv_path):
     
     CSV should have columns: timestamp, open, high, low, close, volume
     """
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(csv_path, engine=CSV_ENGINE)
     
     # Convert timestamp to datetime
     df['timestamp'] = pd.to_datetime(df['timestamp'])
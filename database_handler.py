@@ -7,31 +7,118 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 import json
+import threading
+import time
+from pathlib import Path
+from functools import lru_cache
+
+# sqlite3 looks adapters up by exact type, so the datetime adapter never
+# applies to pandas Timestamps (backtest entry/exit times); store them the
+# same way, as ISO text
+sqlite3.register_adapter(pd.Timestamp, lambda ts: ts.isoformat(sep=' '))
+
+
+@lru_cache(maxsize=32)
+def _insert_query(columns):
+    """INSERT OR REPLACE statement for a tuple of trade columns"""
+    placeholders = ', '.join('?' for _ in columns)
+    return f"INSERT OR REPLACE INTO trades ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+@lru_cache(maxsize=32)
+def _update_query(columns):
+    """UPDATE statement for a tuple of trade columns, built once per column set"""
+    set_clause = ', '.join(f"{column} = ?" for column in columns)
+    return f"UPDATE trades SET {set_clause} WHERE trade_id = ?"
 
 
 class TradingDatabase:
-    def __init__(self, db_path='trading_data.db'):
-        """Initialize database connection"""
+    # Seconds a cached performance summary stays valid
+    _CACHE_TTL = 30.0
+
+    def __init__(self, db_path='trading_data.db', trace_sql=False):
+        """
+        Initialize database connection
+
+        Parameters:
+        -----------
+        db_path : str
+            Path to the SQLite database file
+        trace_sql : bool
+            Print every SQL statement executed (debugging aid)
+        """
         self.db_path = db_path
-        self.conn = None
+        self.trace_sql = trace_sql
+        self.conn = None  # Persistent read-write connection, opened on first use
+        self._write_lock = threading.Lock()
+
+        # Read-only connection shared by all get_* queries
+        self.ro_conn = None
+        self._ro_lock = threading.Lock()
+
+        # Performance summary cache: mode -> (monotonic timestamp, summary)
+        self._agg_cache = {}
+        self._cache_lock = threading.Lock()
+
         self.create_tables()
     
     def connect(self):
-        """Connect to database"""
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+        """
+        Get the persistent read-write connection
+
+        Opened once and reused by every write instead of reconnecting (and
+        re-reading the schema) per trade; writers serialize on _write_lock.
+        """
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            if self.trace_sql:
+                self.conn.set_trace_callback(lambda sql: print(f"[SQL] {sql}"))
         return self.conn
-    
+
+    def connect_readonly(self):
+        """
+        Get the persistent read-only connection used for queries
+
+        Opened with mode=ro and PRAGMA query_only so dashboard reads can
+        never take a write lock while the bot is saving trades.
+        """
+        if self.ro_conn is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            self.ro_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self.ro_conn.row_factory = sqlite3.Row
+            self.ro_conn.execute('PRAGMA query_only = 1')
+            if self.trace_sql:
+                self.ro_conn.set_trace_callback(lambda sql: print(f"[SQL ro] {sql}"))
+        return self.ro_conn
+
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
-    
+        """Close the read-write connection; the next connect() reopens it"""
+        with self._write_lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+    def close_readonly(self):
+        """Close the read-only connection"""
+        with self._ro_lock:
+            if self.ro_conn:
+                self.ro_conn.close()
+                self.ro_conn = None
+
+    def clear_cache(self):
+        """Invalidate cached performance summaries"""
+        with self._cache_lock:
+            self._agg_cache.clear()
+
     def create_tables(self):
         """Create database tables"""
         conn = self.connect()
         cursor = conn.cursor()
-        
+
+        # WAL lets the read-only connection query while trades are written
+        cursor.execute('PRAGMA journal_mode=WAL')
+
         # Trades table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trades (
@@ -59,8 +146,12 @@ class TradingDatabase:
             )
         ''')
         
+        # Open-exposure and per-mode summary queries filter on status and mode
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_trades_status_mode ON trades(status, mode)'
+        )
+        
         conn.commit()
-        self.close()
     
     def insert_trade(self, trade_data):
         """Insert a new trade record"""
@@ -73,24 +164,74 @@ class TradingDatabase:
         if 'indicators' in trade_data and isinstance(trade_data['indicators'], dict):
             trade_data['indicators'] = json.dumps(trade_data['indicators'])
         
-        columns = ', '.join(trade_data.keys())
-        placeholders = ', '.join(['?' for _ in trade_data])
+        query = _insert_query(tuple(trade_data))
+        
+        with self._write_lock:
+            try:
+                cursor.execute(query, list(trade_data.values()))
+                conn.commit()
+                self.clear_cache()
+                print(f"✓ Trade saved: {trade_data.get('trade_id')}")
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"✗ Error saving trade: {e}")
+    
+    def insert_trades(self, trades):
+        """
+        Insert many trade records in one transaction
         
-        query = f"INSERT OR REPLACE INTO trades ({columns}) VALUES ({placeholders})"
+        Records with the same columns go through a single executemany, so a
+        backtest commits once instead of once per trade. Unlike insert_trade,
+        every record must already carry its trade_id.
         
-        try:
-            cursor.execute(query, list(trade_data.values()))
-            conn.commit()
-            print(f"✓ Trade saved: {trade_data.get('trade_id')}")
-        except sqlite3.Error as e:
-            print(f"✗ Error saving trade: {e}")
-        finally:
-            self.close()
+        Parameters:
+        -----------
+        trades : list of dict
+            Trade records, as accepted by insert_trade
+        """
+        batches = {}
+        for trade_data in trades:
+            if 'indicators' in trade_data and isinstance(trade_data['indicators'], dict):
+                trade_data['indicators'] = json.dumps(trade_data['indicators'])
+            batches.setdefault(tuple(trade_data), []).append(tuple(trade_data.values()))
+        
+        conn = self.connect()
+        with self._write_lock:
+            try:
+                for columns, rows in batches.items():
+                    conn.executemany(_insert_query(columns), rows)
+                conn.commit()
+                self.clear_cache()
+                print(f"✓ {len(trades)} trades saved")
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"✗ Error saving trades: {e}")
     
-    def get_all_trades(self, mode=None):
-        """Get all trades"""
+    def update_trade(self, trade_id, fields):
+        """
+        Update columns of an existing trade
+        
+        Parameters:
+        -----------
+        trade_id : str
+            Trade to update
+        fields : dict
+            Column name -> new value
+        """
         conn = self.connect()
+        query = _update_query(tuple(fields))
         
+        with self._write_lock:
+            try:
+                conn.execute(query, list(fields.values()) + [trade_id])
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"✗ Error updating trade: {e}")
+        self.clear_cache()
+    
+    def get_all_trades(self, mode=None):
+        """Get all trades"""
         query = "SELECT * FROM trades"
         params = []
         
@@ -100,13 +241,133 @@ class TradingDatabase:
         
         query += " ORDER BY entry_time DESC"
         
-        df = pd.read_sql_query(query, conn, params=params)
-        self.close()
-        
+        with self._ro_lock:
+            df = pd.read_sql_query(query, self.connect_readonly(), params=params)
+
         return df
     
+    def get_equity_points(self, mode, limit=20):
+        """
+        Get (exit_time, pnl) rows for the most recent closed trades
+
+        Rows are the last `limit` closed trades by entry time, returned in
+        exit-time order so they can be accumulated directly into an equity curve.
+        """
+        query = '''
+            SELECT exit_time, pnl FROM (
+                SELECT exit_time, pnl, entry_time FROM trades
+                WHERE mode = ? AND status = 'CLOSED'
+                ORDER BY entry_time DESC
+                LIMIT ?
+            )
+            ORDER BY exit_time
+        '''
+
+        with self._ro_lock:
+            rows = self.connect_readonly().execute(query, (mode, limit)).fetchall()
+
+        return rows
+
+    def get_open_exposure(self, mode):
+        """
+        Get (open position count, capital tied up in them) for a mode
+
+        Summed in SQL over the OPEN rows only, instead of loading every
+        trade of the mode into a DataFrame.
+        """
+        query = '''
+            SELECT COUNT(*), TOTAL(entry_price * quantity) FROM trades
+            WHERE mode = ? AND status = 'OPEN'
+        '''
+
+        with self._ro_lock:
+            count, used_capital = self.connect_readonly().execute(query, (mode,)).fetchone()
+
+        return count, used_capital
+
     def get_performance_summary(self, mode='live'):
-        """Get overall performance summary"""
+        """Get overall performance summary (cached for _CACHE_TTL seconds)"""
+        with self._cache_lock:
+            cached = self._agg_cache.get(mode)
+        if cached and time.monotonic() - cached[0] < self._CACHE_TTL:
+            return dict(cached[1])
+
+        summary = self._compute_performance_summary(mode)
+
+        with self._cache_lock:
+            self._agg_cache[mode] = (time.monotonic(), summary)
+
+        return dict(summary)
+
+    def get_performance_summary_all(self, modes=('live', 'paper', 'backtest')):
+        """
+        Get performance summaries for several modes in one query
+
+        Parameters:
+        -----------
+        modes : iterable of str
+            Trading modes to summarise
+
+        Returns:
+        --------
+        dict : mode -> summary, in the same shape as get_performance_summary
+        """
+        # One GROUP BY scan instead of loading every mode's trades separately
+        query = '''
+            SELECT mode,
+                   COUNT(*) AS total,
+                   SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) AS wins,
+                   SUM(CASE WHEN pnl < 0 THEN 1 ELSE 0 END) AS losses,
+                   TOTAL(pnl) AS total_pnl,
+                   TOTAL(CASE WHEN pnl > 0 THEN pnl END) AS gross_profit,
+                   TOTAL(CASE WHEN pnl < 0 THEN -pnl END) AS gross_loss
+            FROM trades
+            WHERE status = 'CLOSED'
+            GROUP BY mode
+        '''
+
+        with self._ro_lock:
+            rows = {row['mode']: row for row in self.connect_readonly().execute(query)}
+
+        now = time.monotonic()
+        summaries = {}
+        for mode in modes:
+            row = rows.get(mode)
+            if row is None:
+                summary = {
+                    'total_trades': 0,
+                    'winning_trades': 0,
+                    'losing_trades': 0,
+                    'win_rate': 0,
+                    'total_pnl': 0,
+                    'avg_win': 0,
+                    'avg_loss': 0,
+                    'profit_factor': 0
+                }
+            else:
+                total, wins, losses = row['total'], row['wins'], row['losses']
+                gross_profit, gross_loss = row['gross_profit'], row['gross_loss']
+                summary = {
+                    'total_trades': total,
+                    'winning_trades': wins,
+                    'losing_trades': losses,
+                    'win_rate': wins / total * 100,
+                    'total_pnl': row['total_pnl'],
+                    'avg_win': gross_profit / wins if wins > 0 else 0,
+                    'avg_loss': -gross_loss / losses if losses > 0 else 0,
+                    'profit_factor': gross_profit / gross_loss if gross_loss > 0 else 0
+                }
+            summaries[mode] = summary
+
+        # Prime the per-mode cache so get_performance_summary can reuse these
+        with self._cache_lock:
+            for mode, summary in summaries.items():
+                self._agg_cache[mode] = (now, summary)
+
+        return {mode: dict(summary) for mode, summary in summaries.items()}
+
+    def _compute_performance_summary(self, mode):
+        """Aggregate closed trades into summary statistics"""
         trades = self.get_all_trades(mode=mode)
         trades = trades[trades['status'] == 'CLOSED']
         
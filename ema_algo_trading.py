@@ -9,16 +9,27 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
-import warnings
-warnings.filterwarnings('ignore')
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from collections import namedtuple
+from _njit import njit, NUMBA_AVAILABLE
 
 # Technical Indicators Library
 try:
     import talib
 except ImportError:
-    print("Installing TA-Lib... Please wait")
+    talib = None
+    print("TA-Lib not found, using pandas indicators")
     # You'll need to install: pip install TA-Lib
 
+# Optional: C rolling-window kernels for the backtest indicator pass
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
 # For Angel One API
 try:
     from SmartApi import SmartConnect
@@ -32,7 +43,363 @@ except ImportError:
     print("Install Zerodha API: pip install kiteconnect")
 
 
+# Indicator series precomputed once over a full OHLCV frame, aligned by bar index
+IndicatorArrays = namedtuple('IndicatorArrays', [
+    'close', 'high', 'low', 'volume',
+    'ema9', 'ema15', 'rsi', 'macd', 'macd_signal',
+    'support', 'resistance',    # 20-bar rolling low / high
+    'swing_low', 'swing_high',  # 10-bar rolling low / high
+    'vol_avg',                  # mean volume of the previous 5 bars
+])
+
+# Precomputed IndicatorArrays are memoized on disk, keyed by a hash of the
+# OHLCV input. Bump the version whenever an indicator definition changes.
+INDICATOR_CACHE_DIR = Path.home() / '.cache' / 'ema_bot'
+INDICATOR_CACHE_VERSION = 2
+
+
+def _rolling_min(values, window):
+    """Trailing rolling minimum, NaN until the window is full"""
+    if bn is not None:
+        return bn.move_min(values, window)
+    return pd.Series(values).rolling(window=window).min().to_numpy(dtype=np.float64)
+
+
+def _rolling_max(values, window):
+    """Trailing rolling maximum, NaN until the window is full"""
+    if bn is not None:
+        return bn.move_max(values, window)
+    return pd.Series(values).rolling(window=window).max().to_numpy(dtype=np.float64)
+
+
+def _rolling_mean(values, window):
+    """Trailing rolling mean, NaN until the window is full"""
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+    if bn is not None:
+        return bn.move_mean(values, window)
+    out[window - 1:] = np.convolve(values, np.full(window, 1.0 / window), mode='valid')
+    return out
+
+
+@njit(cache=True)
+def _ema_kernel(values, span):
+    """
+    EMA with the same recurrence as pandas ewm(span=span, adjust=False).mean()
+    
+    Written out step for step (including the division by the weight sum and
+    NaN handling) so results match pandas exactly.
+    """
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_wt_factor = 1.0 - alpha
+    new_wt = alpha
+    old_wt = 1.0
+    weighted = values[0]
+    out[0] = weighted
+    
+    for j in range(1, n):
+        cur = values[j]
+        is_observation = not np.isnan(cur)
+        if not np.isnan(weighted):
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = old_wt * weighted + new_wt * cur
+                    weighted = weighted / (old_wt + new_wt)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[j] = weighted
+    
+    return out
+
+
+@njit(cache=True)
+def _ema_step(weighted, old_wt, cur, alpha):
+    """One step of the _ema_kernel recurrence; returns the new (weighted, old_wt)"""
+    is_observation = not np.isnan(cur)
+    if not np.isnan(weighted):
+        old_wt *= 1.0 - alpha
+        if is_observation:
+            if weighted != cur:
+                weighted = old_wt * weighted + alpha * cur
+                weighted = weighted / (old_wt + alpha)
+            old_wt = 1.0
+    elif is_observation:
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def _ema_macd_kernel(close):
+    """
+    EMA 9, EMA 15, MACD line and MACD signal of close in a single pass
+    
+    Runs the five recurrences side by side instead of streaming the close
+    array once per EMA; every value equals the separate _ema_kernel result.
+    """
+    n = close.shape[0]
+    ema9 = np.empty(n, dtype=np.float64)
+    ema15 = np.empty(n, dtype=np.float64)
+    macd = np.empty(n, dtype=np.float64)
+    signal = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return ema9, ema15, macd, signal
+    
+    a9 = 1.0 / (1.0 + (9 - 1) / 2.0)
+    a15 = 1.0 / (1.0 + (15 - 1) / 2.0)
+    a12 = 1.0 / (1.0 + (12 - 1) / 2.0)
+    a26 = 1.0 / (1.0 + (26 - 1) / 2.0)
+    
+    w9 = w15 = w12 = w26 = close[0]
+    o9 = o15 = o12 = o26 = o_sig = 1.0
+    w_sig = w12 - w26
+    ema9[0] = w9
+    ema15[0] = w15
+    macd[0] = w_sig
+    signal[0] = w_sig
+    
+    for j in range(1, n):
+        cur = close[j]
+        w9, o9 = _ema_step(w9, o9, cur, a9)
+        w15, o15 = _ema_step(w15, o15, cur, a15)
+        w12, o12 = _ema_step(w12, o12, cur, a12)
+        w26, o26 = _ema_step(w26, o26, cur, a26)
+        m = w12 - w26
+        w_sig, o_sig = _ema_step(w_sig, o_sig, m, a9)
+        ema9[j] = w9
+        ema15[j] = w15
+        macd[j] = m
+        signal[j] = w_sig
+    
+    return ema9, ema15, macd, signal
+
+
+def _ema(values, span):
+    """EMA of a float64 array: compiled kernel with numba, pandas ewm without"""
+    if NUMBA_AVAILABLE:
+        return _ema_kernel(values, span)
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy(dtype=np.float64)
+
+
+# Why a position was closed, as recorded by the backtest core
+EXIT_STOP_LOSS = 1
+EXIT_TARGET = 2
+EXIT_CROSSOVER = 3
+
+
+# ------------------------------------------------------------------
+# Scalar strategy rules. Plain numeric arguments only, so the same
+# functions serve the live DataFrame path and the JIT backtest loop.
+# Directions: 1 = LONG / BUY, -1 = SHORT / SELL, 0 = flat / no signal
+# ------------------------------------------------------------------
+
+@njit(cache=True)
+def _near_key_level(price, support, resistance, tolerance):
+    """True when price is within tolerance of support or resistance"""
+    near_support = abs(price - support) / price < tolerance
+    near_resistance = abs(price - resistance) / price < tolerance
+    return near_support or near_resistance
+
+
+@njit(cache=True)
+def _crossed(ema9_prev, ema15_prev, ema9_current, ema15_current):
+    """True on a bullish or bearish EMA 9/15 crossover"""
+    bullish_cross = (ema9_prev <= ema15_prev) and (ema9_current > ema15_current)
+    bearish_cross = (ema9_prev >= ema15_prev) and (ema9_current < ema15_current)
+    return bullish_cross or bearish_cross
+
+
+@njit(cache=True)
+def _entry_direction(price, ema9_prev, ema15_prev, ema9_current, ema15_current,
+                     rsi_current, macd_current, macd_signal_current,
+                     volume_confirmed, near_key_level):
+    """Entry rules for a single bar"""
+    # Check for EMA crossover
+    bullish_cross = (ema9_prev <= ema15_prev) and (ema9_current > ema15_current)
+    bearish_cross = (ema9_prev >= ema15_prev) and (ema9_current < ema15_current)
+    
+    # BUY Signal Logic
+    if bullish_cross:
+        # Confirmations
+        rsi_ok = rsi_current < 70  # Not overbought
+        macd_ok = macd_current > macd_signal_current  # MACD bullish
+        price_above_ema = price > ema9_current
+        
+        if volume_confirmed and rsi_ok and macd_ok and price_above_ema and near_key_level:
+            return 1
+    
+    # SELL Signal Logic
+    elif bearish_cross:
+        # Confirmations
+        rsi_ok = rsi_current > 30  # Not oversold
+        macd_ok = macd_current < macd_signal_current  # MACD bearish
+        price_below_ema = price < ema9_current
+        
+        if volume_confirmed and rsi_ok and macd_ok and price_below_ema and near_key_level:
+            return -1
+    
+    return 0
+
+
+@njit(cache=True)
+def _stop_loss_target_prices(price, swing_low, swing_high, direction):
+    """Stop loss beyond the swing point, target at 1:2 risk-reward"""
+    if direction == 1:
+        stop_loss = swing_low * 0.998  # Slightly below swing low
+        risk = price - stop_loss
+        target = price + (risk * 2)
+    else:
+        stop_loss = swing_high * 1.002  # Slightly above swing high
+        risk = stop_loss - price
+        target = price - (risk * 2)
+    return stop_loss, target
+
+
+@njit(cache=True)
+def _position_size(capital, risk_amount, entry_price, stop_loss_price):
+    """Shares risking risk_amount (capital * risk per trade), capped at what capital can buy"""
+    risk_per_share = abs(entry_price - stop_loss_price)
+    
+    if risk_per_share == 0:
+        return 0
+    
+    quantity = int(risk_amount / risk_per_share)
+    
+    # Ensure we can afford it
+    max_quantity = int(capital / entry_price)
+    return min(quantity, max_quantity)
+
+
+@njit(cache=True)
+def _price_exit_reason(direction, price, stop_loss, target):
+    """EXIT_STOP_LOSS / EXIT_TARGET if price breached a level, else 0"""
+    if direction == 1:
+        if price <= stop_loss:
+            return EXIT_STOP_LOSS
+        if price >= target:
+            return EXIT_TARGET
+    elif direction == -1:
+        if price >= stop_loss:
+            return EXIT_STOP_LOSS
+        if price <= target:
+            return EXIT_TARGET
+    return 0
+
+
+@njit(cache=True)
+def _crossover_exit_reason(direction, ema9_prev, ema15_prev, ema9_current, ema15_current):
+    """EXIT_CROSSOVER if the EMAs crossed against the position, else 0"""
+    if direction == 1:
+        if (ema9_prev >= ema15_prev) and (ema9_current < ema15_current):
+            return EXIT_CROSSOVER
+    elif direction == -1:
+        if (ema9_prev <= ema15_prev) and (ema9_current > ema15_current):
+            return EXIT_CROSSOVER
+    return 0
+
+
+@njit(cache=True)
+def _backtest_core(close, ema9, ema15, rsi, macd, macd_signal, volume, vol_avg,
+                   support, resistance, swing_low, swing_high, crossed,
+                   capital, risk_per_trade, start):
+    """
+    Walk every bar from start, entering and exiting one position at a time
+    
+    Entry rules are only evaluated on bars flagged in crossed, since every
+    entry needs an EMA crossover. Position size always uses the starting
+    capital, as calculate_position_size does. Returns per-trade arrays (entry bar, exit bar or -1 if still open,
+    direction, quantity, stop loss, target, exit reason) and the per-bar
+    equity (realized capital plus mark-to-market of the open position).
+    """
+    n = close.shape[0]
+    entry_bar = np.empty(n, np.int64)
+    exit_bar = np.full(n, -1, np.int64)
+    direction = np.zeros(n, np.int64)
+    quantity = np.zeros(n, np.int64)
+    stop_loss = np.zeros(n, np.float64)
+    target = np.zeros(n, np.float64)
+    exit_reason = np.zeros(n, np.int64)
+    equity = np.full(n, capital)
+    
+    n_trades = 0
+    position = 0
+    realized = capital
+    risk_amount = capital * risk_per_trade  # Sizing uses the starting capital throughout
+    
+    for i in range(start, n):
+        price = close[i]
+        
+        # Check exit conditions first
+        if position != 0:
+            t = n_trades - 1
+            reason = _price_exit_reason(position, price, stop_loss[t], target[t])
+            if reason == 0:
+                reason = _crossover_exit_reason(
+                    position, ema9[i-1], ema15[i-1], ema9[i], ema15[i]
+                )
+            if reason != 0:
+                if position == 1:
+                    pnl = (price - close[entry_bar[t]]) * quantity[t]
+                else:
+                    pnl = (close[entry_bar[t]] - price) * quantity[t]
+                realized += pnl
+                exit_bar[t] = i
+                exit_reason[t] = reason
+                position = 0
+        
+        # Generate new signals if no position
+        if position == 0 and crossed[i]:
+            signal = _entry_direction(
+                price, ema9[i-1], ema15[i-1], ema9[i], ema15[i],
+                rsi[i], macd[i], macd_signal[i],
+                volume[i] > vol_avg[i] * 1.2,
+                _near_key_level(price, support[i], resistance[i], 0.005)
+            )
+            if signal != 0:
+                sl, tgt = _stop_loss_target_prices(price, swing_low[i], swing_high[i], signal)
+                qty = _position_size(capital, risk_amount, price, sl)
+                if qty > 0:
+                    entry_bar[n_trades] = i
+                    direction[n_trades] = signal
+                    quantity[n_trades] = qty
+                    stop_loss[n_trades] = sl
+                    target[n_trades] = tgt
+                    n_trades += 1
+                    position = signal
+        
+        # Mark-to-market
+        if position != 0:
+            t = n_trades - 1
+            entry_price = close[entry_bar[t]]
+            if position == 1:
+                unrealized = (price - entry_price) * quantity[t]
+            else:
+                unrealized = (entry_price - price) * quantity[t]
+            equity[i] = realized + unrealized
+        else:
+            equity[i] = realized
+    
+    return (entry_bar[:n_trades], exit_bar[:n_trades], direction[:n_trades],
+            quantity[:n_trades], stop_loss[:n_trades], target[:n_trades],
+            exit_reason[:n_trades], equity)
+
+
 class EMAStrategy:
+    _SIGNALS = {1: 'BUY', -1: 'SELL'}
+    _DIRECTIONS = {'BUY': 1, 'SELL': -1, 'LONG': 1, 'SHORT': -1}
+    _EXIT_MESSAGES = {
+        EXIT_STOP_LOSS: "Stop Loss Hit!",
+        EXIT_TARGET: "Target Hit!",
+        EXIT_CROSSOVER: "EMA Crossover Exit!",
+    }
+    
     def __init__(self, capital=10000, risk_per_trade=0.02):
         """
         Initialize the trading strategy
@@ -50,26 +417,63 @@ class EMAStrategy:
         self.entry_price = 0
         self.stop_loss = 0
         self.target = 0
+        self.last_indicators = {}  # Indicator values behind the latest signal check
+        
+        # EMAs of the last frame seen, so check_exit_conditions and
+        # generate_signal on the same bar share one computation
+        self._ema_source = None  # (frame, length, last close)
+        self._ema_cache = {}     # period -> EMA array
         
+    def _close_array(self, data):
+        """Close prices as a contiguous float64 array"""
+        return np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+    
     def calculate_ema(self, data, period):
         """Calculate Exponential Moving Average"""
-        return data['close'].ewm(span=period, adjust=False).mean()
+        close = self._close_array(data)
+        last_close = close[-1] if len(close) else None
+        
+        # Holding the frame itself (not its id) keeps the identity check safe
+        source = self._ema_source
+        if (source is None or source[0] is not data or source[1] != len(close)
+                or source[2] != last_close):
+            self._ema_source = (data, len(close), last_close)
+            self._ema_cache = {}
+        
+        ema = self._ema_cache.get(period)
+        if ema is None:
+            # Seeded from the first close like pandas ewm(adjust=False); talib.EMA
+            # seeds from an SMA and would move early crossovers, so it is not used
+            ema = _ema(close, period)
+            self._ema_cache[period] = ema
+        return ema
     
     def calculate_rsi(self, data, period=14):
         """Calculate Relative Strength Index"""
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        close = self._close_array(data)
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        
+        if talib is not None:
+            avg_gain = talib.SMA(gain, timeperiod=period)
+            avg_loss = talib.SMA(loss, timeperiod=period)
+        else:
+            avg_gain = _rolling_mean(gain, period)
+            avg_loss = _rolling_mean(loss, period)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            rsi = 100 - (100 / (1 + rs))
         return rsi
     
     def calculate_macd(self, data):
         """Calculate MACD"""
-        exp1 = data['close'].ewm(span=12, adjust=False).mean()
-        exp2 = data['close'].ewm(span=26, adjust=False).mean()
+        close = self._close_array(data)
+        exp1 = _ema(close, 12)
+        exp2 = _ema(close, 26)
         macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
+        signal = _ema(macd, 9)
         histogram = macd - signal
         return macd, signal, histogram
     
@@ -82,8 +486,9 @@ class EMAStrategy:
         if len(data) < lookback + 1:
             return False
         
-        current_volume = data['volume'].iloc[-1]
-        avg_volume = data['volume'].iloc[-lookback-1:-1].mean()
+        volume = data['volume'].to_numpy(dtype=np.float64)
+        current_volume = volume[-1]
+        avg_volume = volume[-lookback-1:-1].mean()
         
         return current_volume > avg_volume * 1.2  # 20% above average
     
@@ -96,12 +501,9 @@ class EMAStrategy:
         if len(data) < window:
             return None, None
         
-        # Find local highs and lows
-        highs = data['high'].rolling(window=window).max()
-        lows = data['low'].rolling(window=window).min()
-        
-        resistance = highs.iloc[-1]
-        support = lows.iloc[-1]
+        # Only the latest window matters, so reduce the tail directly
+        resistance = data['high'].to_numpy(dtype=np.float64)[-window:].max()
+        support = data['low'].to_numpy(dtype=np.float64)[-window:].min()
         
         return support, resistance
     
@@ -114,11 +516,7 @@ class EMAStrategy:
         if support is None or resistance is None:
             return True  # If can't determine, allow trade
         
-        # Check if price is within tolerance of support or resistance
-        near_support = abs(price - support) / price < tolerance
-        near_resistance = abs(price - resistance) / price < tolerance
-        
-        return near_support or near_resistance
+        return _near_key_level(price, support, resistance, tolerance)
     
     def generate_signal(self, data):
         """
@@ -130,54 +528,189 @@ class EMAStrategy:
             return None
         
         # Calculate indicators
-        data['ema9'] = self.calculate_ema(data, 9)
-        data['ema15'] = self.calculate_ema(data, 15)
-        data['rsi'] = self.calculate_rsi(data)
-        data['macd'], data['macd_signal'], data['macd_hist'] = self.calculate_macd(data)
+        ema9 = self.calculate_ema(data, 9)
+        ema15 = self.calculate_ema(data, 15)
         
-        # Get current values
-        current_price = data['close'].iloc[-1]
-        ema9_current = data['ema9'].iloc[-1]
-        ema15_current = data['ema15'].iloc[-1]
-        ema9_prev = data['ema9'].iloc[-2]
-        ema15_prev = data['ema15'].iloc[-2]
+        # Every entry needs a crossover, so skip the confirmations on other bars
+        if not _crossed(ema9[-2], ema15[-2], ema9[-1], ema15[-1]):
+            self.last_indicators = {'ema9': float(ema9[-1]), 'ema15': float(ema15[-1])}
+            return None
         
-        rsi_current = data['rsi'].iloc[-1]
-        macd_current = data['macd'].iloc[-1]
-        macd_signal_current = data['macd_signal'].iloc[-1]
+        rsi = self.calculate_rsi(data)
+        macd, macd_signal, macd_hist = self.calculate_macd(data)
         
-        # Check for EMA crossover
-        bullish_cross = (ema9_prev <= ema15_prev) and (ema9_current > ema15_current)
-        bearish_cross = (ema9_prev >= ema15_prev) and (ema9_current < ema15_current)
+        # Kept on the strategy instead of written back into the caller's frame
+        self.last_indicators = {
+            'ema9': float(ema9[-1]),
+            'ema15': float(ema15[-1]),
+            'rsi': float(rsi[-1]),
+            'macd': float(macd[-1]),
+        }
         
         # Volume confirmation
         volume_confirmed = self.check_volume_increase(data)
         
         # Support/Resistance check
         support, resistance = self.find_support_resistance(data)
+        
+        return self._evaluate_signal(
+            current_price=data['close'].iloc[-1],
+            ema9_prev=ema9[-2],
+            ema15_prev=ema15[-2],
+            ema9_current=ema9[-1],
+            ema15_current=ema15[-1],
+            rsi_current=rsi[-1],
+            macd_current=macd[-1],
+            macd_signal_current=macd_signal[-1],
+            volume_confirmed=volume_confirmed,
+            support=support,
+            resistance=resistance
+        )
+    
+    def _evaluate_signal(self, current_price, ema9_prev, ema15_prev, ema9_current,
+                         ema15_current, rsi_current, macd_current, macd_signal_current,
+                         volume_confirmed, support, resistance):
+        """Apply the entry rules to the indicator values of a single bar"""
         near_key_level = self.is_near_support_resistance(current_price, support, resistance)
         
-        # BUY Signal Logic
-        if bullish_cross:
-            # Confirmations
-            rsi_ok = rsi_current < 70  # Not overbought
-            macd_ok = macd_current > macd_signal_current  # MACD bullish
-            price_above_ema = current_price > ema9_current
-            
-            if volume_confirmed and rsi_ok and macd_ok and price_above_ema and near_key_level:
-                return 'BUY'
-        
-        # SELL Signal Logic
-        elif bearish_cross:
-            # Confirmations
-            rsi_ok = rsi_current > 30  # Not oversold
-            macd_ok = macd_current < macd_signal_current  # MACD bearish
-            price_below_ema = current_price < ema9_current
-            
-            if volume_confirmed and rsi_ok and macd_ok and price_below_ema and near_key_level:
-                return 'SELL'
+        direction = _entry_direction(
+            current_price, ema9_prev, ema15_prev, ema9_current, ema15_current,
+            rsi_current, macd_current, macd_signal_current,
+            volume_confirmed, near_key_level
+        )
+        return self._SIGNALS.get(direction)
+    
+    def precompute_indicators(self, data, cache_dir=INDICATOR_CACHE_DIR):
+        """
+        Compute every indicator the strategy needs once over the full history
+        
+        All indicators are causal, so the value at bar i equals what
+        generate_signal would compute on data.iloc[:i+1].
+        
+        Parameters:
+        -----------
+        data : pandas.DataFrame
+            OHLCV data
+        cache_dir : str or Path, optional
+            Directory of the on-disk cache; re-running a backtest on the same
+            data loads the arrays from there. None disables the cache.
+        
+        Returns:
+        --------
+        IndicatorArrays of numpy arrays aligned with the rows of data
+        """
+        close = self._close_array(data)
+        high = np.ascontiguousarray(data['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(data['low'].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(data['volume'].to_numpy(dtype=np.float64))
+        
+        if cache_dir is None:
+            return self._compute_indicators(data, close, high, low, volume)
+        
+        key = hashlib.blake2b(str(INDICATOR_CACHE_VERSION).encode(), digest_size=16)
+        for column in (close, high, low, volume):
+            key.update(column.tobytes())
+        path = Path(cache_dir) / f"{key.hexdigest()}.npz"
         
-        return None
+        try:
+            with np.load(path) as cached:
+                return IndicatorArrays(**{field: cached[field] for field in IndicatorArrays._fields})
+        except Exception:
+            pass  # Not cached yet (or unreadable): compute and store below
+        
+        arrays = self._compute_indicators(data, close, high, low, volume)
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays._asdict())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write indicator cache: {e}")
+        
+        return arrays
+    
+    def _compute_indicators(self, data, close, high, low, volume):
+        """Build IndicatorArrays from the OHLCV columns of data"""
+        if NUMBA_AVAILABLE:
+            ema9, ema15, macd, macd_signal = _ema_macd_kernel(close)
+        else:
+            ema9 = self.calculate_ema(data, 9)
+            ema15 = self.calculate_ema(data, 15)
+            macd, macd_signal, _ = self.calculate_macd(data)
+        
+        # Mean of the 5 bars before each bar. Each window is summed on its own
+        # (no running sum), matching check_volume_increase bit for bit
+        vol_avg = np.full_like(volume, np.nan)
+        if len(volume) > 5:
+            windows = np.lib.stride_tricks.sliding_window_view(volume[:-1], 5)
+            vol_avg[5:] = windows.mean(axis=1)
+        
+        return IndicatorArrays(
+            close=close,
+            high=high,
+            low=low,
+            volume=volume,
+            ema9=ema9,
+            ema15=ema15,
+            rsi=self.calculate_rsi(data),
+            macd=macd,
+            macd_signal=macd_signal,
+            support=_rolling_min(low, 20),
+            resistance=_rolling_max(high, 20),
+            swing_low=_rolling_min(low, 10),
+            swing_high=_rolling_max(high, 10),
+            vol_avg=vol_avg,
+        )
+    
+    def crossover_mask(self, ema9, ema15):
+        """
+        Flag every bar where EMA 9 crossed EMA 15 in either direction
+        
+        Matches the bullish/bearish cross tests of the entry rules: a bar is
+        flagged when ema9 > ema15 (or ema9 < ema15) holds now but not on the
+        previous bar.
+        """
+        above = ema9 > ema15
+        below = ema9 < ema15
+        crossed = np.zeros(len(ema9), dtype=np.bool_)
+        crossed[1:] = (above[1:] & ~above[:-1]) | (below[1:] & ~below[:-1])
+        return crossed
+    
+    def simulate(self, arrays, start=30):
+        """
+        Run the entry/exit rules over every bar of precomputed indicators
+        
+        Uses the JIT-compiled core when numba is installed. Nothing is
+        printed and the strategy state is left untouched; callers replay
+        the returned trades for reporting.
+        
+        Returns:
+        --------
+        dict of numpy arrays: entry_bar, exit_bar (-1 while open), direction
+        (1 LONG / -1 SHORT), quantity, stop_loss, target, exit_reason and
+        the per-bar equity
+        """
+        (entry_bar, exit_bar, direction, quantity, stop_loss, target,
+         exit_reason, equity) = _backtest_core(
+            arrays.close, arrays.ema9, arrays.ema15, arrays.rsi,
+            arrays.macd, arrays.macd_signal, arrays.volume, arrays.vol_avg,
+            arrays.support, arrays.resistance, arrays.swing_low, arrays.swing_high,
+            self.crossover_mask(arrays.ema9, arrays.ema15),
+            float(self.capital), float(self.risk_per_trade), start
+        )
+        return {
+            'entry_bar': entry_bar,
+            'exit_bar': exit_bar,
+            'direction': direction,
+            'quantity': quantity,
+            'stop_loss': stop_loss,
+            'target': target,
+            'exit_reason': exit_reason,
+            'equity': equity,
+        }
     
     def calculate_position_size(self, entry_price, stop_loss_price):
         """
@@ -187,18 +720,7 @@ class EMAStrategy:
         Position Size = (Capital * Risk%) / (Entry - Stop Loss)
         """
         risk_amount = self.capital * self.risk_per_trade
-        risk_per_share = abs(entry_price - stop_loss_price)
-        
-        if risk_per_share == 0:
-            return 0
-        
-        quantity = int(risk_amount / risk_per_share)
-        
-        # Ensure we can afford it
-        max_quantity = int(self.capital / entry_price)
-        quantity = min(quantity, max_quantity)
-        
-        return quantity
+        return _position_size(self.capital, risk_amount, entry_price, stop_loss_price)
     
     def calculate_stop_loss_target(self, data, signal_type):
         """
@@ -207,26 +729,20 @@ class EMAStrategy:
         Stop Loss: Recent swing low (for BUY) or swing high (for SELL)
         Target: 2x risk (Risk-Reward = 1:2)
         """
-        current_price = data['close'].iloc[-1]
-        
-        if signal_type == 'BUY':
-            # Stop loss at recent swing low
-            swing_low = data['low'].iloc[-10:].min()
-            stop_loss = swing_low * 0.998  # Slightly below swing low
-            risk = current_price - stop_loss
-            target = current_price + (risk * 2)  # 1:2 RR
-            
-        elif signal_type == 'SELL':
-            # Stop loss at recent swing high
-            swing_high = data['high'].iloc[-10:].max()
-            stop_loss = swing_high * 1.002  # Slightly above swing high
-            risk = stop_loss - current_price
-            target = current_price - (risk * 2)  # 1:2 RR
-        
-        else:
+        return self._stop_loss_target(
+            data['close'].iloc[-1],
+            data['low'].to_numpy(dtype=np.float64)[-10:].min(),
+            data['high'].to_numpy(dtype=np.float64)[-10:].max(),
+            signal_type
+        )
+    
+    def _stop_loss_target(self, current_price, swing_low, swing_high, signal_type):
+        """Place stop loss beyond the swing point and target at 1:2 risk-reward"""
+        direction = self._DIRECTIONS.get(signal_type, 0)
+        if direction == 0:
             return None, None
         
-        return stop_loss, target
+        return _stop_loss_target_prices(current_price, swing_low, swing_high, direction)
     
     def check_exit_conditions(self, data):
         """
@@ -243,45 +759,42 @@ class EMAStrategy:
         current_price = data['close'].iloc[-1]
         
         # Check stop loss and target
-        if self.position == 'LONG':
-            if current_price <= self.stop_loss:
-                print(f"Stop Loss Hit! Exit LONG at {current_price}")
-                return True
-            if current_price >= self.target:
-                print(f"Target Hit! Exit LONG at {current_price}")
-                return True
-        
-        elif self.position == 'SHORT':
-            if current_price >= self.stop_loss:
-                print(f"Stop Loss Hit! Exit SHORT at {current_price}")
-                return True
-            if current_price <= self.target:
-                print(f"Target Hit! Exit SHORT at {current_price}")
-                return True
+        if self._price_exit(current_price):
+            return True
         
         # Check for opposite EMA crossover
-        data['ema9'] = self.calculate_ema(data, 9)
-        data['ema15'] = self.calculate_ema(data, 15)
-        
-        ema9_current = data['ema9'].iloc[-1]
-        ema15_current = data['ema15'].iloc[-1]
-        ema9_prev = data['ema9'].iloc[-2]
-        ema15_prev = data['ema15'].iloc[-2]
-        
-        if self.position == 'LONG':
-            bearish_cross = (ema9_prev >= ema15_prev) and (ema9_current < ema15_current)
-            if bearish_cross:
-                print(f"EMA Crossover Exit! Exit LONG at {current_price}")
-                return True
-        
-        elif self.position == 'SHORT':
-            bullish_cross = (ema9_prev <= ema15_prev) and (ema9_current > ema15_current)
-            if bullish_cross:
-                print(f"EMA Crossover Exit! Exit SHORT at {current_price}")
-                return True
+        ema9 = self.calculate_ema(data, 9)
+        ema15 = self.calculate_ema(data, 15)
         
+        return self._crossover_exit(
+            current_price, ema9[-2], ema15[-2], ema9[-1], ema15[-1]
+        )
+    
+    def _price_exit(self, current_price):
+        """Check stop loss and target for the open position"""
+        reason = _price_exit_reason(
+            self._DIRECTIONS.get(self.position, 0), current_price, self.stop_loss, self.target
+        )
+        if reason:
+            self.announce_exit(reason, current_price)
+            return True
         return False
     
+    def _crossover_exit(self, current_price, ema9_prev, ema15_prev, ema9_current, ema15_current):
+        """Check for an EMA crossover against the open position"""
+        reason = _crossover_exit_reason(
+            self._DIRECTIONS.get(self.position, 0),
+            ema9_prev, ema15_prev, ema9_current, ema15_current
+        )
+        if reason:
+            self.announce_exit(reason, current_price)
+            return True
+        return False
+    
+    def announce_exit(self, reason, current_price):
+        """Print why the open position is being closed"""
+        print(f"{self._EXIT_MESSAGES[reason]} Exit {self.position} at {current_price}")
+    
     def execute_trade(self, signal, data):
         """
         Execute the trade (placeholder - integrate with broker API)
@@ -378,21 +891,64 @@ def backtest_strategy(data):
     print(f"Risk per Trade: {strategy.risk_per_trade*100}%")
     print("="*60)
     
-    for i in range(30, len(data)):
-        current_data = data.iloc[:i+1].copy()
-        
-        # Check exit conditions first
-        if strategy.position:
-            if strategy.check_exit_conditions(current_data):
-                strategy.exit_trade(current_data)
-        
-        # Generate new signals if no position
-        if strategy.position is None:
-            signal = strategy.generate_signal(current_data)
-            if signal:
-                strategy.execute_trade(signal, current_data)
+    # Bars are stepped in the compiled core; trades are reported once at the end
+    arrays = strategy.precompute_indicators(data)
+    result = strategy.simulate(arrays)
+    trades = trade_log(data, arrays.close, result)
     
     print("Backtest Complete!")
+    if len(trades):
+        print(trades.to_string(index=False))
+    else:
+        print("No trades executed")
+    
+    return trades
+
+
+def trade_log(data, close, result):
+    """
+    Tabulate the trades returned by EMAStrategy.simulate
+    
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        The OHLCV data that was simulated (timestamp column optional)
+    close : numpy.ndarray
+        Close prices aligned with data
+    result : dict
+        Output of EMAStrategy.simulate
+    
+    Returns:
+    --------
+    pandas.DataFrame with one row per trade; exit columns are empty for a
+    position still open at the end of the data
+    """
+    times = data['timestamp'].to_numpy() if 'timestamp' in data.columns else data.index.to_numpy()
+    entry_bar = result['entry_bar']
+    exit_bar = result['exit_bar']
+    direction = result['direction']
+    closed = exit_bar >= 0
+    
+    entry_price = close[entry_bar]
+    exit_price = np.where(closed, close[exit_bar], np.nan)
+    pnl_per_unit = (exit_price - entry_price) * direction
+    
+    reasons = {0: None, EXIT_STOP_LOSS: 'STOP_LOSS', EXIT_TARGET: 'TARGET',
+               EXIT_CROSSOVER: 'EMA_CROSSOVER'}
+    
+    return pd.DataFrame({
+        'entry_time': times[entry_bar],
+        'position': np.where(direction == 1, 'LONG', 'SHORT'),
+        'entry_price': entry_price,
+        'quantity': result['quantity'],
+        'stop_loss': result['stop_loss'],
+        'target': result['target'],
+        'exit_time': pd.Series(times[exit_bar]).where(closed),
+        'exit_price': exit_price,
+        'pnl': pnl_per_unit * result['quantity'],
+        'pnl_percent': pnl_per_unit / entry_price * 100,
+        'exit_reason': [reasons[r] for r in result['exit_reason']],
+    })
 
 
 # ==========================================
@@ -436,6 +992,25 @@ def fetch_live_data(smart_api, symbol, exchange, interval='FIVE_MINUTE'):
     pass
 
 
+def sleep_until_next_candle(interval=300, delay=0.1):
+    """
+    Sleep until just after the next candle boundary
+    
+    Boundaries are aligned to the epoch (:00, :05, :10 ... for 5-minute
+    candles, which also lines up with the 9:15 IST open), so each iteration
+    runs right after a candle closes instead of drifting by the time the
+    loop body took.
+    
+    Parameters:
+    -----------
+    interval : int
+        Candle length in seconds (default 300 = 5 minutes)
+    delay : float
+        Seconds to wait past the boundary so the closed candle is available
+    """
+    time.sleep(interval - (time.time() % interval) + delay)
+
+
 def run_live_trading(symbol='SBIN', exchange='NSE'):
     """
     Run the strategy in live trading mode
@@ -470,7 +1045,7 @@ def run_live_trading(symbol='SBIN', exchange='NSE'):
             #         # Place order via API
             
             # Wait for next candle
-            time.sleep(300)  # 5 minutes
+            sleep_until_next_candle(300)  # 5 minutes
             
         except KeyboardInterrupt:
             print("\nStopping live trading...")
@@ -7,13 +7,24 @@ import websocket
 import json
 import threading
 import time
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from collections import deque
 import logging
 
+# orjson parses the small ticker frames several times faster than json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Completed candles kept in the ring buffer
+CANDLE_CAPACITY = 500
+
 
 class KrakenWebSocket:
     """
@@ -31,21 +42,38 @@ class KrakenWebSocket:
         # Keep the slash - Kraken WebSocket expects "XBT/USDT" format
         self.kraken_symbol = symbol.replace('BTC', 'XBT')
 
-        # Store recent trades to build candles
+        # Store recent trades as (epoch seconds, price) tuples
         self.recent_trades = deque(maxlen=1000)
         self.current_price = None
         self.last_update = None
-
-        # Candle building (1-minute candles)
-        self.candles = []
-        self.current_candle = None
+        self._ticker = None  # Latest raw ticker payload, converted only when read
+        self._last_print = 0  # Time of the last console price line
+
+        # Completed 1-minute candles as a ring buffer of column arrays;
+        # _head is the next slot to write, the oldest candle is overwritten
+        self._ts = np.empty(CANDLE_CAPACITY, dtype='datetime64[ns]')
+        self._open = np.empty(CANDLE_CAPACITY, dtype=np.float64)
+        self._high = np.empty(CANDLE_CAPACITY, dtype=np.float64)
+        self._low = np.empty(CANDLE_CAPACITY, dtype=np.float64)
+        self._close = np.empty(CANDLE_CAPACITY, dtype=np.float64)
+        self._volume = np.empty(CANDLE_CAPACITY, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._candle_lock = threading.Lock()
+        # Candle being built from ticks, as plain floats (no dict per tick)
+        self._cur_minute_epoch = None  # Minutes since the epoch, None before the first tick
+        self._c_open = self._c_high = self._c_low = self._c_close = 0.0
 
         logger.info(f"🚀 Initializing Kraken WebSocket for {symbol}")
 
     def _on_message(self, ws, message):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(message)
+            # Heartbeats are the most frequent frame and carry nothing
+            if message.startswith('{"event":"heartbeat"'):
+                return
+
+            data = _json_loads(message)
 
             # Log subscription confirmations and system messages
             if isinstance(data, dict):
@@ -68,20 +96,23 @@ class KrakenWebSocket:
 
                     # Extract price (last trade price)
                     if 'c' in ticker_data:  # 'c' = close/last price
+                        # Kraken sends prices as decimal strings
                         price = float(ticker_data['c'][0])
+                        now = time.time()
                         self.current_price = price
-                        self.last_update = time.time()
+                        self.last_update = now
+                        self._ticker = ticker_data
 
                         # Add to recent trades
-                        self.recent_trades.append({
-                            'price': price,
-                            'timestamp': datetime.now()
-                        })
+                        self.recent_trades.append((now, price))
 
                         # Build candles
-                        self._update_candle(price)
+                        self._update_candle(price, now)
 
-                        print(f"[WS] {self.symbol}: ${price:,.2f}", end='\r')
+                        # Refresh the console line at most once per second
+                        if self.last_update - self._last_print >= 1:
+                            self._last_print = self.last_update
+                            print(f"[WS] {self.symbol}: ${price:,.2f}", end='\r')
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
@@ -112,35 +143,41 @@ class KrakenWebSocket:
         ws.send(json.dumps(subscribe_message))
         logger.info(f"📡 Subscribed to {self.kraken_symbol} ticker feed")
 
-    def _update_candle(self, price):
-        """Build 1-minute candles from tick data"""
-        now = datetime.now()
-        current_minute = now.replace(second=0, microsecond=0)
+    def _update_candle(self, price, now):
+        """Build 1-minute candles from tick data received at epoch time now"""
+        # Compare whole minutes as ints; only build a datetime when the minute rolls over
+        minute_epoch = int(now) // 60
 
-        if self.current_candle is None or self.current_candle['timestamp'] != current_minute:
+        if minute_epoch != self._cur_minute_epoch:
             # New candle
-            if self.current_candle is not None:
+            if self._cur_minute_epoch is not None:
                 # Save completed candle
-                self.candles.append(self.current_candle)
-
-                # Keep only last 500 candles
-                if len(self.candles) > 500:
-                    self.candles.pop(0)
+                self._store_candle()
 
             # Start new candle
-            self.current_candle = {
-                'timestamp': current_minute,
-                'open': price,
-                'high': price,
-                'low': price,
-                'close': price,
-                'volume': 0
-            }
+            self._cur_minute_epoch = minute_epoch
+            self._c_open = self._c_high = self._c_low = self._c_close = price
         else:
             # Update current candle
-            self.current_candle['high'] = max(self.current_candle['high'], price)
-            self.current_candle['low'] = min(self.current_candle['low'], price)
-            self.current_candle['close'] = price
+            if price > self._c_high:
+                self._c_high = price
+            elif price < self._c_low:
+                self._c_low = price
+            self._c_close = price
+
+    def _store_candle(self):
+        """Write the completed current candle into the ring buffer"""
+        timestamp = datetime.fromtimestamp(self._cur_minute_epoch * 60)
+        with self._candle_lock:
+            i = self._head
+            self._ts[i] = np.datetime64(timestamp, 'ns')
+            self._open[i] = self._c_open
+            self._high[i] = self._c_high
+            self._low[i] = self._c_low
+            self._close[i] = self._c_close
+            self._volume[i] = 0  # The ticker feed carries no per-candle volume
+            self._head = (i + 1) % CANDLE_CAPACITY
+            self._count = min(self._count + 1, CANDLE_CAPACITY)
 
     def start(self):
         """Start WebSocket connection in background thread"""
@@ -162,8 +199,13 @@ class KrakenWebSocket:
             on_close=self._on_close
         )
 
-        # Run in background thread
-        self.thread = threading.Thread(target=self.ws.run_forever)
+        # Run in background thread. websocket-client validates UTF-8 in pure
+        # Python on every frame (unless wsaccel is installed), holding the GIL
+        # the strategy thread needs; Kraken frames are ASCII JSON, so skip it
+        self.thread = threading.Thread(
+            target=self.ws.run_forever,
+            kwargs={'skip_utf8_validation': True}
+        )
         self.thread.daemon = True
         self.thread.start()
 
@@ -193,32 +235,59 @@ class KrakenWebSocket:
 
         return self.current_price
 
-    def get_candles(self, limit=100):
+    def get_ticker(self):
         """
-        Get recent 1-minute candles as DataFrame
+        Get the latest 24-hour ticker, in the same shape as
+        MarketDataFetcher.fetch_crypto_price
 
         Returns:
         --------
-        pandas.DataFrame with OHLCV data
+        dict with price data, or None if there is no fresh ticker
         """
-        if not self.candles:
+        ticker = self._ticker
+        if ticker is None or self.get_current_price() is None:
             return None
 
-        # Get last N candles
-        recent_candles = self.candles[-limit:] if len(self.candles) > limit else self.candles
-
-        if not recent_candles:
+        try:
+            # Kraken sends [today, last 24 hours] pairs; use the rolling 24h values
+            price = float(ticker['c'][0])
+            open_24h = float(ticker['o'][1])
+            return {
+                'price': price,
+                'open': open_24h,
+                'high': float(ticker['h'][1]),
+                'low': float(ticker['l'][1]),
+                'volume': float(ticker['v'][1]),
+                'change_percent': (price - open_24h) / open_24h * 100 if open_24h else 0.0
+            }
+        except (KeyError, IndexError, ValueError):
             return None
 
-        # Convert to DataFrame
-        df = pd.DataFrame(recent_candles)
+    def get_candles(self, limit=100):
+        """
+        Get recent 1-minute candles as DataFrame
 
-        # Ensure proper data types
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        Returns:
+        --------
+        pandas.DataFrame with OHLCV data
+        """
+        with self._candle_lock:
+            n = min(limit, self._count)
+            if n <= 0:
+                return None
+
+            # Positions of the last n candles, oldest first
+            idx = np.arange(self._head - n, self._head) % CANDLE_CAPACITY
+
+            # Fancy indexing copies, so the frame is safe from later writes
+            df = pd.DataFrame({
+                'timestamp': self._ts[idx],
+                'open': self._open[idx],
+                'high': self._high[idx],
+                'low': self._low[idx],
+                'close': self._close[idx],
+                'volume': self._volume[idx],
+            })
 
         return df
 
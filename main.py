@@ -4,17 +4,124 @@ Orchestrates live trading, paper trading, and backtesting
 """
 
 import argparse
+import hashlib
+import os
+import pickle
 import sys
+import tempfile
 from datetime import datetime
 import configparser
+import logging
+from collections import namedtuple
+from functools import cached_property
+from pathlib import Path
 
-# Import trading modules
-from ema_algo_trading import EMAStrategy
-from angel_one_live_trading import run_live_trading_angel_one, AngelOneTrading
-from mudrex_crypto_trading import run_crypto_trading, MudrexTrading
-from paper_trading import run_paper_trading, PaperTradingSimulator
-from backtest_engine import BacktestEngine, load_historical_data
-from database_handler import TradingDatabase
+# Trading modules (pandas, broker SDKs, matplotlib...) are imported inside the
+# command that needs them, so --help or --performance don't pay for all of them
+
+logger = logging.getLogger(__name__)
+
+# Typed values the run modes read from config.ini, snapshotted once per app
+TradingSettings = namedtuple('TradingSettings', [
+    'symbol', 'exchange', 'capital', 'risk_per_trade',
+    'angel_api_key', 'angel_client_code', 'angel_password', 'angel_totp_secret',
+    'mudrex_api_key', 'mudrex_api_secret',
+    'crypto_symbol', 'crypto_capital', 'crypto_risk_per_trade'
+])
+
+
+def read_settings(config):
+    """
+    Snapshot the run-mode settings from a parsed config
+
+    Parameters:
+    -----------
+    config : configparser.ConfigParser or None
+        Parsed config.ini; None gives the defaults for every value
+
+    Returns:
+    --------
+    TradingSettings
+    """
+    def get(section, option, fallback=''):
+        if config is None:
+            return fallback
+        # Raw: secrets may contain '%', which is not interpolation syntax here
+        return config.get(section, option, raw=True, fallback=fallback)
+    
+    def get_float(section, option, fallback):
+        value = get(section, option, fallback)
+        try:
+            return float(value)
+        except ValueError:
+            logger.error("✗ Invalid %s/%s in config: %r, using %s", section, option, value, fallback)
+            return float(fallback)
+
+    return TradingSettings(
+        symbol=get('TRADING', 'SYMBOL', 'SBIN'),
+        exchange=get('TRADING', 'EXCHANGE', 'NSE'),
+        capital=get_float('TRADING', 'TOTAL_CAPITAL', '10000'),
+        risk_per_trade=get_float('TRADING', 'RISK_PER_TRADE', '0.02'),
+        angel_api_key=get('ANGEL_ONE', 'API_KEY'),
+        angel_client_code=get('ANGEL_ONE', 'CLIENT_CODE'),
+        angel_password=get('ANGEL_ONE', 'PASSWORD'),
+        angel_totp_secret=get('ANGEL_ONE', 'TOTP_SECRET'),
+        mudrex_api_key=get('MUDREX', 'API_KEY'),
+        mudrex_api_secret=get('MUDREX', 'API_SECRET'),
+        crypto_symbol=get('CRYPTO', 'SYMBOL', 'BTC/USDT'),
+        crypto_capital=get_float('CRYPTO', 'CAPITAL', '10000'),
+        crypto_risk_per_trade=get_float('CRYPTO', 'RISK_PER_TRADE', '0.02')
+    )
+
+
+# Finished backtests are pickled here, keyed by the data file, the settings
+# and the strategy/engine sources, so re-running the same backtest is a load
+BACKTEST_CACHE_DIR = Path.home() / '.cache' / 'ema_bot' / 'backtests'
+BACKTEST_CACHE_VERSION = 1
+
+
+def _backtest_cache_path(data_file, capital, risk, symbol):
+    """Cache file for a backtest, or None if an input can't be stat'ed"""
+    here = Path(__file__).resolve().parent
+    key = hashlib.blake2b(f"{BACKTEST_CACHE_VERSION}|{capital}|{risk}|{symbol}".encode(), digest_size=16)
+    try:
+        for path in (Path(data_file).resolve(), here / 'ema_algo_trading.py', here / 'backtest_engine.py'):
+            stat = os.stat(path)
+            key.update(f"|{path}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+    except OSError:
+        return None
+    return BACKTEST_CACHE_DIR / f"{key.hexdigest()}.pkl"
+
+
+# Parsed config files keyed by path -> (mtime_ns, ConfigParser); a file is
+# only re-parsed when it changes on disk
+_CONFIG_CACHE = {}
+
+def _banner(title):
+    """Section banner as one preformatted string"""
+    return f"\n{'='*60}\n{title}\n{'='*60}\n"
+
+
+# Section banners, built once and each logged in a single call
+_BANNERS = {
+    'live_stocks': _banner('🚀 STARTING LIVE STOCK TRADING'),
+    'live_crypto': _banner('🚀 STARTING LIVE CRYPTO TRADING'),
+    'paper': _banner('📝 STARTING PAPER TRADING MODE'),
+    'backtest': _banner('🔬 STARTING BACKTEST'),
+    'dashboard': _banner('📊 LAUNCHING DASHBOARD'),
+    'performance': _banner('📈 PERFORMANCE SUMMARY'),
+}
+
+# One mode's section of the --performance report, filled from its summary dict
+_PERF_TEMPLATE = (
+    "\n{mode} MODE:\n"
+    "  Total Trades: {total_trades}\n"
+    "  Winning Trades: {winning_trades}\n"
+    "  Losing Trades: {losing_trades}\n"
+    "  Win Rate: {win_rate:.2f}%\n"
+    "  Total P&L: ₹{total_pnl:,.2f}\n"
+    "  Profit Factor: {profit_factor:.2f}\n"
+)
 
 
 class TradingBotApp:
@@ -27,135 +134,160 @@ class TradingBotApp:
         config_file : str
             Path to configuration file
         """
+        from database_handler import TradingDatabase
+        
         self.config = self.load_config(config_file)
         self.db = TradingDatabase()
     
+    @cached_property
+    def settings(self):
+        """Run-mode settings, read on first use so modes that need none never parse them"""
+        return read_settings(self.config)
+    
     def load_config(self, config_file):
-        """Load configuration from file"""
+        """Load configuration from file, reusing the parsed copy while it is unchanged"""
+        try:
+            mtime = os.stat(config_file).st_mtime_ns
+        except OSError:
+            mtime = None  # Missing file: parse as before (yields an empty config)
+        
+        cached = _CONFIG_CACHE.get(config_file)
+        if cached is not None and mtime is not None and cached[0] == mtime:
+            logger.info("✓ Configuration loaded from %s (cached)", config_file)
+            return cached[1]
+        
         config = configparser.ConfigParser()
         
         try:
             config.read(config_file)
-            print(f"✓ Configuration loaded from {config_file}")
+            if mtime is not None:
+                _CONFIG_CACHE[config_file] = (mtime, config)
+            logger.info("✓ Configuration loaded from %s", config_file)
             return config
         except Exception as e:
-            print(f"✗ Error loading config: {e}")
-            print("Using default configuration")
+            logger.error("✗ Error loading config: %s", e)
+            logger.warning("Using default configuration")
             return None
     
     def run_live_stocks(self):
         """Run live stock trading with Angel One"""
-        print("\n" + "="*60)
-        print("🚀 STARTING LIVE STOCK TRADING")
-        print("="*60 + "\n")
+        logger.info(_BANNERS['live_stocks'])
         
         if not self.config:
-            print("❌ Configuration file not found. Please update config.ini")
+            logger.error("❌ Configuration file not found. Please update config.ini")
             return
         
-        # Get credentials from config
-        api_key = self.config.get('ANGEL_ONE', 'API_KEY')
-        client_code = self.config.get('ANGEL_ONE', 'CLIENT_CODE')
-        password = self.config.get('ANGEL_ONE', 'PASSWORD')
-        totp_secret = self.config.get('ANGEL_ONE', 'TOTP_SECRET')
-        
-        # Get trading parameters
-        symbol = self.config.get('TRADING', 'SYMBOL', fallback='SBIN')
-        exchange = self.config.get('TRADING', 'EXCHANGE', fallback='NSE')
-        capital = float(self.config.get('TRADING', 'TOTAL_CAPITAL', fallback='10000'))
+        settings = self.settings
         
         # Validate credentials
-        if api_key == 'your_api_key_here':
-            print("❌ Please update your Angel One API credentials in config.ini")
+        if not settings.angel_api_key or settings.angel_api_key == 'your_api_key_here':
+            logger.error("❌ Please update your Angel One API credentials in config.ini")
             return
         
         # Run live trading
+        from angel_one_live_trading import run_live_trading_angel_one
         run_live_trading_angel_one(
-            api_key=api_key,
-            client_code=client_code,
-            password=password,
-            totp_secret=totp_secret,
-            symbol=symbol,
-            exchange=exchange,
-            capital=capital
+            api_key=settings.angel_api_key,
+            client_code=settings.angel_client_code,
+            password=settings.angel_password,
+            totp_secret=settings.angel_totp_secret,
+            symbol=settings.symbol,
+            exchange=settings.exchange,
+            capital=settings.capital
         )
     
     def run_live_crypto(self):
         """Run live crypto trading with Mudrex"""
-        print("\n" + "="*60)
-        print("🚀 STARTING LIVE CRYPTO TRADING")
-        print("="*60 + "\n")
+        logger.info(_BANNERS['live_crypto'])
         
         if not self.config:
-            print("❌ Configuration file not found. Please update config.ini")
+            logger.error("❌ Configuration file not found. Please update config.ini")
             return
         
-        # Get credentials from config
-        api_key = self.config.get('MUDREX', 'API_KEY', fallback='')
-        api_secret = self.config.get('MUDREX', 'API_SECRET', fallback='')
-        
-        # Get trading parameters
-        symbol = self.config.get('CRYPTO', 'SYMBOL', fallback='BTC/USDT')
-        capital = float(self.config.get('CRYPTO', 'CAPITAL', fallback='10000'))
-        risk = float(self.config.get('CRYPTO', 'RISK_PER_TRADE', fallback='0.02'))
+        settings = self.settings
         
         # Validate credentials
-        if not api_key or api_key == 'your_mudrex_api_key':
-            print("❌ Please update your Mudrex API credentials in config.ini")
+        if not settings.mudrex_api_key or settings.mudrex_api_key == 'your_mudrex_api_key':
+            logger.error("❌ Please update your Mudrex API credentials in config.ini")
             return
         
         # Run crypto trading
+        from mudrex_crypto_trading import run_crypto_trading
         run_crypto_trading(
-            api_key=api_key,
-            api_secret=api_secret,
-            symbol=symbol,
-            capital=capital,
-            risk_per_trade=risk
+            api_key=settings.mudrex_api_key,
+            api_secret=settings.mudrex_api_secret,
+            symbol=settings.crypto_symbol,
+            capital=settings.crypto_capital,
+            risk_per_trade=settings.crypto_risk_per_trade
         )
     
     def run_paper_mode(self):
         """Run paper trading mode"""
-        print("\n" + "="*60)
-        print("📝 STARTING PAPER TRADING MODE")
-        print("="*60 + "\n")
+        logger.info(_BANNERS['paper'])
         
-        # Get trading parameters
-        symbol = 'SBIN'
-        exchange = 'NSE'
-        capital = 10000
+        settings = self.settings
         
-        if self.config:
-            symbol = self.config.get('TRADING', 'SYMBOL', fallback='SBIN')
-            exchange = self.config.get('TRADING', 'EXCHANGE', fallback='NSE')
-            capital = float(self.config.get('TRADING', 'TOTAL_CAPITAL', fallback='10000'))
-        
-        run_paper_trading(symbol=symbol, exchange=exchange, capital=capital)
+        from paper_trading import run_paper_trading
+        run_paper_trading(symbol=settings.symbol, exchange=settings.exchange,
+                          capital=settings.capital)
     
     def run_backtest(self, data_file):
         """Run backtest on historical data"""
-        print("\n" + "="*60)
-        print("🔬 STARTING BACKTEST")
-        print("="*60 + "\n")
+        logger.info(_BANNERS['backtest'])
         
-        # Load data
-        try:
-            data = load_historical_data(data_file)
-        except Exception as e:
-            print(f"❌ Error loading data: {e}")
-            return
+        from backtest_engine import BacktestEngine, load_historical_data
         
-        # Get parameters
-        capital = 10000
-        risk = 0.02
         symbol = 'TEST'
+        capital = self.settings.capital
+        risk = self.settings.risk_per_trade
+        engine = BacktestEngine(initial_capital=capital, risk_per_trade=risk)
         
-        if self.config:
-            capital = float(self.config.get('TRADING', 'TOTAL_CAPITAL', fallback='10000'))
-            risk = float(self.config.get('TRADING', 'RISK_PER_TRADE', fallback='0.02'))
+        # Same file, settings and strategy code as an earlier run: reuse it
+        cache_path = _backtest_cache_path(data_file, capital, risk, symbol)
+        cached = None
+        if cache_path is not None:
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+            except Exception:
+                pass  # Not cached yet (or unreadable): run it below
         
-        # Run backtest
-        engine = BacktestEngine(initial_capital=capital, risk_per_trade=risk)
-        results = engine.run_backtest(data, symbol=symbol)
+        if cached is not None:
+            results, engine.trades, engine.equity_curve, engine.capital = cached
+            logger.info("✓ Loaded cached backtest results for %s", data_file)
+            # Save the trades as a fresh run would; INSERT OR REPLACE makes it
+            # a no-op for a database that already holds them
+            if engine.trades:
+                engine.db.insert_trades(engine.trades)
+            if results:
+                engine.print_results(results)
+        else:
+            # Load data
+            try:
+                data = load_historical_data(data_file)
+            except Exception as e:
+                logger.error("❌ Error loading data: %s", e)
+                return
+            
+            # Run backtest
+            results = engine.run_backtest(data, symbol=symbol)
+            
+            if cache_path is not None:
+                tmp_path = None
+                try:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Write to a temp file and rename so readers never see a partial file
+                    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+                    with os.fdopen(fd, 'wb') as f:
+                        pickle.dump((results, engine.trades, engine.equity_curve, engine.capital), f)
+                    os.replace(tmp_path, cache_path)
+                except Exception as e:
+                    logger.warning("⚠️ Could not write backtest cache: %s", e)
+                    if tmp_path is not None:
+                        try:
+                            os.unlink(tmp_path)
+                        except OSError:
+                            pass
         
         if results:
             # Plot results
@@ -163,31 +295,32 @@ class TradingBotApp:
     
     def run_dashboard(self):
         """Launch web dashboard"""
-        print("\n" + "="*60)
-        print("📊 LAUNCHING DASHBOARD")
-        print("="*60 + "\n")
+        logger.info(_BANNERS['dashboard'])
+        
+        # Point the dashboard at the database this app is using
+        os.environ['TB_DB_PATH'] = self.db.db_path
+        
+        try:
+            # Serve the dashboard from this process: pandas/numpy are already
+            # imported, which saves a fresh interpreter's 1-2s startup
+            from streamlit.web import bootstrap
+        except ImportError:
+            import subprocess
+            subprocess.run(['streamlit', 'run', 'dashboard.py'])
+            return
         
-        import subprocess
-        subprocess.run(['streamlit', 'run', 'dashboard.py'])
+        bootstrap.load_config_options(flag_options={})
+        bootstrap.run('dashboard.py', False, [], {})
     
     def show_performance(self):
         """Show performance summary"""
-        print("\n" + "="*60)
-        print("📈 PERFORMANCE SUMMARY")
-        print("="*60 + "\n")
-        
-        modes = ['live', 'paper', 'backtest']
+        summaries = self.db.get_performance_summary_all(['live', 'paper', 'backtest'])
         
-        for mode in modes:
-            summary = self.db.get_performance_summary(mode=mode)
-            
-            print(f"\n{mode.upper()} MODE:")
-            print(f"  Total Trades: {summary['total_trades']}")
-            print(f"  Winning Trades: {summary['winning_trades']}")
-            print(f"  Losing Trades: {summary['losing_trades']}")
-            print(f"  Win Rate: {summary['win_rate']:.2f}%")
-            print(f"  Total P&L: ₹{summary['total_pnl']:,.2f}")
-            print(f"  Profit Factor: {summary['profit_factor']:.2f}")
+        # Build the whole report and write it out once
+        parts = [_BANNERS['performance'], '\n']
+        for mode, summary in summaries.items():
+            parts.append(_PERF_TEMPLATE.format(mode=mode.upper(), **summary))
+        sys.stdout.write(''.join(parts))
 
 
 def main():
@@ -220,11 +353,19 @@ Examples:
                        help='Show performance summary')
     parser.add_argument('--config', type=str, default='config.ini',
                        help='Configuration file path (default: config.ini)')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Only show warnings and errors')
     
     args = parser.parse_args()
     
+    # Status messages go through logging so --quiet (or a caller raising the
+    # level) skips them without formatting or writing anything. They stay on
+    # stdout, in order with the print()ed help text
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO,
+                        format='%(message)s', stream=sys.stdout)
+    
     # Show banner
-    print("""
+    logger.info("""
     ╔═══════════════════════════════════════════════════════════╗
     ║                                                           ║
     ║           📈 EMA TRADING BOT v1.0 📈                      ║
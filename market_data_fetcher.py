@@ -5,36 +5,168 @@ Supports both REST API (CoinGecko) and WebSocket (Kraken)
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import time
+import threading
 import hmac
 import hashlib
 import json
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# orjson decodes the kline/market_chart payloads several times faster than
+# the stdlib json behind response.json()
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Columns kept from a Binance kline row (open time, OHLC as strings, volume)
+_KLINE_DTYPE = np.dtype([
+    ('timestamp', 'i8'), ('open', 'f8'), ('high', 'f8'),
+    ('low', 'f8'), ('close', 'f8'), ('volume', 'f8')
+])
+
+
+@lru_cache(maxsize=256)
+def _binance_symbol(symbol):
+    """Binance symbol for a trading pair (BTC/USDT -> BTCUSDT), memoized per pair"""
+    return symbol.replace('/', '').upper()
+
+
+def _klines_frame(rows):
+    """
+    Build the OHLCV DataFrame from a _KLINE_DTYPE array (ms timestamps)
+
+    Built from the field arrays with the timestamps already converted,
+    rather than creating the frame and then replacing its int column.
+    """
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(rows['timestamp'], unit='ms'),
+        'open': rows['open'],
+        'high': rows['high'],
+        'low': rows['low'],
+        'close': rows['close'],
+        'volume': rows['volume']
+    }, copy=False)
+
+
+# Most (symbol, interval, limit) kline responses kept in the REST cache
+KLINES_CACHE_SIZE = 32
+
+# Candle length in seconds per interval, used to expire the klines cache
+INTERVAL_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900,
+    '1h': 3600, '4h': 14400, '1d': 86400
+}
+
+
+_SHARED_SESSION = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_shared_session():
+    """
+    Process-wide requests session for the public market data APIs
+
+    Every MarketDataFetcher (the module singleton, the paper trading runner,
+    scripts) reuses the same connection pool to Binance and CoinGecko. The
+    session carries no credentials - API keys are passed per request - so
+    it is safe to share; MudrexTrading keeps its own keyed session.
+    """
+    global _SHARED_SESSION
+    if _SHARED_SESSION is None:
+        with _SHARED_LOCK:
+            if _SHARED_SESSION is None:
+                session = requests.Session()
+                # Keep more connections alive and retry dropped connections
+                # and 5xx replies on the same pool. Retry's default methods are
+                # the idempotent ones, so POSTs never repeat; 429s are left to
+                # the CoinGecko backoff, and a final bad status is still
+                # returned, not raised
+                adapter = HTTPAdapter(
+                    pool_connections=20,
+                    pool_maxsize=50,
+                    max_retries=Retry(total=3, backoff_factor=0.1,
+                                      status_forcelist=(500, 502, 503, 504),
+                                      raise_on_status=False)
+                )
+                session.mount('https://', adapter)
+                _SHARED_SESSION = session
+    return _SHARED_SESSION
 
 
 class MarketDataFetcher:
     """Fetch real market data from exchanges"""
 
+    # Trading pair -> CoinGecko coin ID
+    _COINGECKO_IDS = {
+        'BTC/USDT': 'bitcoin',
+        'ETH/USDT': 'ethereum',
+        'BNB/USDT': 'binancecoin',
+        'SOL/USDT': 'solana',
+        'XRP/USDT': 'ripple',
+        'ADA/USDT': 'cardano',
+        'DOGE/USDT': 'dogecoin',
+        'MATIC/USDT': 'matic-network',
+        'DOT/USDT': 'polkadot',
+        'LINK/USDT': 'chainlink',
+    }
+
+    # Interval -> days of market_chart history to request
+    # CoinGecko automatically selects granularity based on days:
+    # - 1 day = 5-minute intervals (288 data points)
+    # - 2-90 days = hourly intervals
+    # - 91+ days = daily intervals
+    _COINGECKO_DAYS = {
+        '1m': 1,    # 1 day = 5-min intervals (auto)
+        '5m': 1,    # 1 day = 5-min intervals (auto)
+        '15m': 7,   # 7 days = hourly intervals (auto)
+        '1h': 7,    # 7 days = hourly intervals (auto)
+        '4h': 30,   # 30 days = hourly intervals (auto)
+        '1d': 90,   # 90 days = daily intervals (auto)
+    }
+
     def __init__(self, api_key=None, api_secret=None, use_mudrex=False, coingecko_api_key=None, use_websocket=False):
-        self.session = requests.Session()
+        self.session = get_shared_session()
         self.api_key = api_key
         self.api_secret = api_secret
+        self._hmac_base = None  # Keyed HMAC for Mudrex signatures, built on first use
         self.use_mudrex = use_mudrex
         # Note: Mudrex API is for TRADE EXECUTION only, not market data
         self.mudrex_base_url = "https://trade.mudrex.com/fapi/v1"
         # CoinGecko for free market data
         self.coingecko_base_url = "https://api.coingecko.com/api/v3"
         self.coingecko_api_key = coingecko_api_key or "CG-GgCnwTc2xkSQ2mDTHaaii7mt"  # Demo API key
+        self._coingecko_requests = {}  # (coin_id, days) -> (url, params)
+        # (coin_id, days) -> (conditional request headers, price points) of the
+        # last 200 response that carried an ETag or Last-Modified validator
+        self._coingecko_validators = {}
 
         # WebSocket support for real-time data
         self.use_websocket = use_websocket
         self.ws_client = None
 
-        # Cache to avoid rate limits
-        # CoinGecko updates data every 5 minutes, so cache for 4.5 min to catch updates quickly
-        self._cache = {}
-        self._cache_duration = 270  # 4.5 minutes (270 seconds) - catches 5-min updates without waste
+        # Cache to avoid rate limits: an entry is served until the next candle
+        # close (see _cache_expiry), when new data can first exist
+        # (symbol, interval, limit) -> (DataFrame, expiry epoch), least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()  # fetch_many_klines reads/writes the caches from threads
+        self._cache_period_floor = 300  # CoinGecko updates data every 5 minutes
+        self._max_cache_duration = 3600  # Upper bound for long intervals
+
+        # Binance klines already fetched, per (symbol, interval) -> (DataFrame,
+        # open time in ms of its last candle); later calls only fetch newer rows
+        self._klines_cache = {}
 
     def fetch_crypto_price(self, symbol):
         """
@@ -49,38 +181,83 @@ class MarketDataFetcher:
         --------
         dict with price data or None
         """
+        # Serve from the streaming ticker when it covers this symbol (no HTTP)
+        if self.use_websocket and self.ws_client and self.ws_client.is_connected():
+            if _binance_symbol(self.ws_client.symbol) == _binance_symbol(symbol):
+                ticker = self.ws_client.get_ticker()
+                if ticker is not None:
+                    return ticker
+
         try:
             # Convert symbol format (BTC/USDT -> BTCUSDT)
-            binance_symbol = symbol.replace('/', '')
+            binance_symbol = _binance_symbol(symbol)
 
             # Fetch from Binance API (free, no auth needed)
             url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={binance_symbol}"
             response = self.session.get(url, timeout=5)
 
             if response.status_code == 200:
-                data = response.json()
-                return {
-                    'price': float(data['lastPrice']),
-                    'open': float(data['openPrice']),
-                    'high': float(data['highPrice']),
-                    'low': float(data['lowPrice']),
-                    'volume': float(data['volume']),
-                    'change_percent': float(data['priceChangePercent'])
-                }
+                return self._parse_binance_ticker(_json_loads(response.content))
             return None
         except Exception as e:
-            print(f"Error fetching crypto price: {e}")
+            logger.error("Error fetching crypto price: %s", e)
             return None
 
+    def fetch_many_prices(self, symbols):
+        """
+        Fetch 24h prices for several symbols in a single Binance request
+
+        Parameters:
+        -----------
+        symbols : list of str
+            Trading pairs like 'BTC/USDT' or 'ETHUSDT'
+
+        Returns:
+        --------
+        dict mapping each requested symbol to its price data (symbols
+        Binance did not return are left out); empty dict on error
+        """
+        if not symbols:
+            return {}
+
+        try:
+            # One round trip for all symbols instead of one per symbol
+            by_binance = {_binance_symbol(s): s for s in symbols}
+            url = "https://api.binance.com/api/v3/ticker/24hr"
+            params = {'symbols': json.dumps(list(by_binance), separators=(',', ':'))}
+            response = self.session.get(url, params=params, timeout=5)
+
+            if response.status_code == 200:
+                return {
+                    by_binance[item['symbol']]: self._parse_binance_ticker(item)
+                    for item in _json_loads(response.content)
+                    if item.get('symbol') in by_binance
+                }
+            return {}
+        except Exception as e:
+            logger.error("Error fetching crypto prices: %s", e)
+            return {}
+
+    def _parse_binance_ticker(self, data):
+        """Convert a Binance 24hr ticker object into the price dict"""
+        return {
+            'price': float(data['lastPrice']),
+            'open': float(data['openPrice']),
+            'high': float(data['highPrice']),
+            'low': float(data['lowPrice']),
+            'volume': float(data['volume']),
+            'change_percent': float(data['priceChangePercent'])
+        }
+
     def _mudrex_signature(self, timestamp, method, endpoint, body=''):
         """Generate HMAC signature for Mudrex"""
         message = f"{timestamp}{method}{endpoint}{body}"
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
+        # Key the HMAC once and copy it per signature
+        if self._hmac_base is None:
+            self._hmac_base = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        mac = self._hmac_base.copy()
+        mac.update(message.encode('utf-8'))
+        return mac.hexdigest()
 
     def _mudrex_request(self, method, endpoint, params=None):
         """Make authenticated request to Mudrex"""
@@ -97,52 +274,50 @@ class MarketDataFetcher:
         }
 
         try:
-            print(f"[DEBUG] Mudrex request to: {url}")
-            print(f"[DEBUG] Params: {params}")
+            logger.debug("Mudrex request to: %s", url)
+            logger.debug("Params: %s", params)
 
             response = self.session.get(url, headers=headers, params=params, timeout=10)
 
-            print(f"[DEBUG] Mudrex response status: {response.status_code}")
+            logger.debug("Mudrex response status: %s", response.status_code)
 
             if response.status_code == 200:
-                return response.json()
+                return _json_loads(response.content)
             else:
-                print(f"[DEBUG] Mudrex error: {response.text[:500]}")
+                logger.warning("Mudrex error: %s", response.text[:500])
                 return None
 
         except Exception as e:
-            print(f"[ERROR] Mudrex request failed: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Mudrex request failed: %s", e)
             return None
 
     def start_websocket(self, symbol='BTC/USDT'):
         """Start WebSocket connection for real-time streaming data"""
         if self.ws_client is not None:
-            print("[WS] WebSocket already running")
+            logger.info("[WS] WebSocket already running")
             return
 
         try:
             from kraken_websocket import KrakenWebSocket
 
-            print(f"[WS] Starting Kraken WebSocket for {symbol}...")
+            logger.info("[WS] Starting Kraken WebSocket for %s...", symbol)
             self.ws_client = KrakenWebSocket(symbol)
             self.ws_client.start()
 
             # Wait for connection and first data (Kraken needs ~5-10 seconds for first ticker)
-            print(f"[WS] Waiting for first ticker data...")
+            logger.info("[WS] Waiting for first ticker data...")
             time.sleep(8)
 
             if self.ws_client.is_connected():
-                print(f"[WS] ✅ WebSocket connected! Real-time 1-second updates active")
+                logger.info("[WS] ✅ WebSocket connected! Real-time 1-second updates active")
                 self.use_websocket = True
             else:
-                print(f"[WS] ⚠️ WebSocket connection failed, falling back to REST API")
+                logger.warning("[WS] ⚠️ WebSocket connection failed, falling back to REST API")
                 self.ws_client = None
                 self.use_websocket = False
 
         except Exception as e:
-            print(f"[WS] ❌ Failed to start WebSocket: {e}")
+            logger.error("[WS] ❌ Failed to start WebSocket: %s", e)
             self.ws_client = None
             self.use_websocket = False
 
@@ -152,7 +327,7 @@ class MarketDataFetcher:
             self.ws_client.stop()
             self.ws_client = None
             self.use_websocket = False
-            print("[WS] WebSocket stopped")
+            logger.info("[WS] WebSocket stopped")
 
     def fetch_crypto_klines(self, symbol, interval='1m', limit=100):
         """
@@ -179,14 +354,15 @@ class MarketDataFetcher:
             # If we have at least 15 candles from WebSocket, use it
             # (Need minimum data for EMA-15 calculation)
             if df_ws is not None and len(df_ws) >= 15:
-                print(f"[WS] Using real-time WebSocket data ({len(df_ws)} candles)")
+                logger.info("[WS] Using real-time WebSocket data (%s candles)", len(df_ws))
                 return df_ws
             else:
                 # WebSocket is new, combine with CoinGecko historical data
-                print(f"[WS] WebSocket has {len(df_ws) if df_ws is not None else 0} candles, fetching historical data from CoinGecko...")
+                logger.info("[WS] WebSocket has %s candles, fetching historical data from CoinGecko...", len(df_ws) if df_ws is not None else 0)
 
-                # Get historical data from CoinGecko
-                df_cg = self._fetch_coingecko_klines(symbol, interval, limit)
+                # Get historical data from CoinGecko, through the REST cache so
+                # the polling loop re-downloads it once per candle, not per call
+                df_cg = self._fetch_rest_klines(symbol, interval, limit)
 
                 if df_cg is not None:
                     # If we have WebSocket data, append the latest real-time candle
@@ -194,172 +370,239 @@ class MarketDataFetcher:
                         # Take historical from CoinGecko and latest from WebSocket
                         latest_ws_candle = df_ws.iloc[-1:]
                         df_combined = pd.concat([df_cg.iloc[:-1], latest_ws_candle], ignore_index=True)
-                        print(f"[HYBRID] Using {len(df_cg)-1} CoinGecko candles + 1 WebSocket candle")
+                        logger.info("[HYBRID] Using %s CoinGecko candles + 1 WebSocket candle", len(df_cg)-1)
                         return df_combined
                     else:
                         return df_cg
                 else:
                     # CoinGecko failed, use whatever WebSocket data we have
                     if df_ws is not None and len(df_ws) > 0:
-                        print(f"[WS] Using available WebSocket data ({len(df_ws)} candles)")
+                        logger.info("[WS] Using available WebSocket data (%s candles)", len(df_ws))
                         return df_ws
                     return None
 
         # Fall back to REST API (CoinGecko)
-        # Check cache first to avoid rate limits
-        cache_key = f"{symbol}_{interval}_{limit}"
-        current_time = time.time()
+        return self._fetch_rest_klines(symbol, interval, limit)
 
-        if cache_key in self._cache:
-            cached_data, cached_time = self._cache[cache_key]
-            cache_age = current_time - cached_time
-
-            if cache_age < self._cache_duration:
-                print(f"[CACHE] Using cached data ({int(cache_age)}s old, fresh for {int(self._cache_duration - cache_age)}s more)")
-                return cached_data
+    def _fetch_rest_klines(self, symbol, interval, limit):
+        """
+        Klines from CoinGecko (Binance as fallback), cached until the next
+        candle close
+        """
+        # Check cache first to avoid rate limits
+        cache_key = (symbol, interval, limit)
+        current_time = time.time()  # Wall clock: candles close on epoch boundaries
+
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+
+        if cached is not None:
+            cached_data, expires_at = cached
+
+            if current_time < expires_at:
+                logger.debug("[CACHE] Using cached data (fresh for %ss more, until the next candle close)", int(expires_at - current_time))
+                # Callers add indicator columns; a shallow copy takes those
+                # without touching the cached frame or copying its data
+                return cached_data.copy(deep=False)
             else:
-                print(f"[CACHE] Cache expired ({int(cache_age)}s old), fetching fresh data...")
+                logger.debug("[CACHE] A candle closed since caching, fetching fresh data...")
 
         # Use CoinGecko for market data (free, no auth needed, not geo-blocked)
-        print(f"[INFO] Fetching market data from CoinGecko (free, reliable)")
+        logger.info("Fetching market data from CoinGecko (free, reliable)")
         df = self._fetch_coingecko_klines(symbol, interval, limit)
 
         # Fallback to Binance if CoinGecko fails (though Binance is geo-blocked on some platforms)
         if df is None:
-            print(f"[WARN] CoinGecko failed, trying Binance...")
+            logger.warning("CoinGecko failed, trying Binance...")
             df = self._fetch_binance_klines(symbol, interval, limit)
 
         # Cache the result if successful
         if df is not None:
-            self._cache[cache_key] = (df.copy(), current_time)
-            print(f"[CACHE] Data cached for {self._cache_duration}s")
+            expires_at = self._cache_expiry(interval, current_time)
+            with self._cache_lock:
+                self._cache[cache_key] = (df, expires_at)
+                self._cache.move_to_end(cache_key)
+                if len(self._cache) > KLINES_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            logger.debug("[CACHE] Data cached for %ss", int(expires_at - current_time))
+            return df.copy(deep=False)
 
         return df
 
+    def _cache_expiry(self, interval, now):
+        """
+        Epoch time at which a klines response fetched at now goes stale
+
+        That is the next close of the interval's candle (but of at least a
+        5-minute candle, as CoinGecko has nothing newer sooner), capped at
+        _max_cache_duration from now for long intervals.
+        """
+        period = max(INTERVAL_SECONDS.get(interval, 60), self._cache_period_floor)
+        next_close = (now // period + 1) * period
+        return min(next_close, now + self._max_cache_duration)
+
+    def fetch_many_klines(self, symbols, interval='1m', limit=100, max_workers=4):
+        """
+        Fetch klines for several symbols concurrently
+
+        The requests are network-bound, so a small thread pool sharing the
+        session's connection pool overlaps their round trips.
+
+        Parameters:
+        -----------
+        symbols : list of str
+            Trading pairs like 'BTC/USDT'
+        interval : str
+            '1m', '5m', '15m', '1h', '4h', '1d'
+        limit : int
+            Number of candles per symbol
+        max_workers : int
+            Requests in flight at once (kept low for CoinGecko's rate limit)
+
+        Returns:
+        --------
+        dict mapping each symbol to its DataFrame (None where the fetch failed)
+        """
+        if not symbols:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+            futures = {pool.submit(self.fetch_crypto_klines, s, interval, limit): s for s in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                # One symbol failing must not discard the others' data
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error("Klines fetch failed for %s: %s", symbol, e)
+                    results[symbol] = None
+
+        # Report in the order the symbols were requested
+        return {s: results[s] for s in symbols}
+
     def _fetch_coingecko_klines(self, symbol, interval, limit):
         """Fetch from CoinGecko API (free, no auth needed)"""
         try:
             # Map symbol to CoinGecko ID
-            symbol_map = {
-                'BTC/USDT': 'bitcoin',
-                'ETH/USDT': 'ethereum',
-                'BNB/USDT': 'binancecoin',
-                'SOL/USDT': 'solana',
-                'XRP/USDT': 'ripple',
-                'ADA/USDT': 'cardano',
-                'DOGE/USDT': 'dogecoin',
-                'MATIC/USDT': 'matic-network',
-                'DOT/USDT': 'polkadot',
-                'LINK/USDT': 'chainlink',
-            }
+            coin_id = self._COINGECKO_IDS.get(symbol, 'bitcoin')
+            logger.debug("Fetching %s (%s) from CoinGecko...", symbol, coin_id)
 
-            coin_id = symbol_map.get(symbol, 'bitcoin')
-            print(f"[DEBUG] Fetching {symbol} ({coin_id}) from CoinGecko...")
+            # Map interval to days
+            days = self._COINGECKO_DAYS.get(interval, 1)
 
             # CoinGecko OHLC endpoint (free, no API key needed)
             # Note: Free tier only supports daily candles, but we can use market_chart for more granular data
-            url = f"{self.coingecko_base_url}/coins/{coin_id}/market_chart"
-
-            # Map interval to days
-            # CoinGecko automatically selects granularity based on days:
-            # - 1 day = 5-minute intervals (288 data points)
-            # - 2-90 days = hourly intervals
-            # - 91+ days = daily intervals
-            interval_days_map = {
-                '1m': 1,    # 1 day = 5-min intervals (auto)
-                '5m': 1,    # 1 day = 5-min intervals (auto)
-                '15m': 7,   # 7 days = hourly intervals (auto)
-                '1h': 7,    # 7 days = hourly intervals (auto)
-                '4h': 30,   # 30 days = hourly intervals (auto)
-                '1d': 90,   # 90 days = daily intervals (auto)
-            }
-
-            days = interval_days_map.get(interval, 1)
-
-            # Don't specify interval - CoinGecko selects automatically based on days
-            params = {
-                'vs_currency': 'usd',
-                'days': days,
-                'x_cg_demo_api_key': self.coingecko_api_key  # Use demo API key for higher limits
-            }
-
-            print(f"[DEBUG] CoinGecko request: {url}")
-            print(f"[DEBUG] Params (with API key): vs_currency=usd, days={days}")
-            print(f"[DEBUG] Using CoinGecko Demo API key for higher rate limits")
+            # The URL and query are fixed per (coin, days), so build them once.
+            # Params are a tuple of pairs so no caller can mutate the cached copy
+            request = self._coingecko_requests.get((coin_id, days))
+            if request is None:
+                # Don't specify interval - CoinGecko selects automatically based on days
+                request = (
+                    f"{self.coingecko_base_url}/coins/{coin_id}/market_chart",
+                    (
+                        ('vs_currency', 'usd'),
+                        ('days', days),
+                        ('x_cg_demo_api_key', self.coingecko_api_key)  # Use demo API key for higher limits
+                    )
+                )
+                self._coingecko_requests[(coin_id, days)] = request
+            url, params = request
+
+            logger.debug("CoinGecko request: %s", url)
+            logger.debug("Params (with API key): vs_currency=usd, days=%s", days)
+            logger.debug("Using CoinGecko Demo API key for higher rate limits")
 
             # Retry logic for rate limits (429 errors)
             max_retries = 3
             retry_delay = 2  # Start with 2 seconds
 
+            # Revalidate the last response; a 304 means the chart is unchanged
+            validated = self._coingecko_validators.get((coin_id, days))
+            headers = validated[0] if validated is not None else None
+
             for attempt in range(max_retries):
-                response = self.session.get(url, params=params, timeout=10)
-                print(f"[DEBUG] Response status: {response.status_code}")
+                response = self.session.get(url, params=params, headers=headers, timeout=10)
+                logger.debug("Response status: %s", response.status_code)
 
-                if response.status_code == 200:
+                if response.status_code in (200, 304):
                     break
                 elif response.status_code == 429:
                     if attempt < max_retries - 1:
                         wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"[WARN] Rate limit hit, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                        logger.warning("Rate limit hit, retrying in %ss... (attempt %s/%s)", wait_time, attempt + 1, max_retries)
                         time.sleep(wait_time)
                     else:
-                        print(f"[ERROR] Rate limit persists after {max_retries} attempts")
+                        logger.error("Rate limit persists after %s attempts", max_retries)
                         return None
                 else:
                     # Other errors, don't retry
                     break
 
-            if response.status_code == 200:
-                data = response.json()
+            if response.status_code == 304 and validated is not None:
+                prices = validated[1]
+                logger.debug("CoinGecko data not modified, reusing %s price points", len(prices))
+            elif response.status_code == 200:
+                data = _json_loads(response.content)
 
                 if 'prices' not in data or not data['prices']:
-                    print(f"[DEBUG] No price data in CoinGecko response")
+                    logger.debug("No price data in CoinGecko response")
                     return None
 
-                # Convert to DataFrame
                 prices = data['prices']
-                print(f"[DEBUG] Got {len(prices)} price points from CoinGecko")
+                logger.debug("Got %s price points from CoinGecko", len(prices))
+
+                validators = {}
+                if response.headers.get('ETag'):
+                    validators['If-None-Match'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    validators['If-Modified-Since'] = response.headers['Last-Modified']
+                if validators:
+                    self._coingecko_validators[(coin_id, days)] = (validators, prices)
+            else:
+                prices = None
 
-                # Create OHLCV-like dataframe
+            if prices is not None:
+                # Convert to DataFrame
+                # Create OHLCV-like dataframe from only the requested number
+                # of points, building the columns directly in their final order
                 # CoinGecko returns [timestamp, price] for each point
                 # We'll simulate OHLCV by treating each price as close
-                df = pd.DataFrame(prices, columns=['timestamp', 'close'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                points = np.array(prices[-limit:], dtype=np.float64)
+                close = points[:, 1]
 
                 # For simplicity, set open = close for each candle
                 # In real scenario, CoinGecko's paid API provides true OHLCV
-                df['open'] = df['close']
-                df['high'] = df['close'] * 1.001  # Simulate slight variation
-                df['low'] = df['close'] * 0.999
-                df['volume'] = 1000000  # Placeholder volume
-
-                # Limit to requested number of candles
-                df = df.tail(limit).reset_index(drop=True)
-
-                # Reorder columns
-                df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+                df = pd.DataFrame({
+                    'timestamp': pd.to_datetime(points[:, 0].astype(np.int64), unit='ms'),
+                    'open': close,
+                    'high': close * 1.001,  # Simulate slight variation
+                    'low': close * 0.999,
+                    'close': close,
+                    'volume': np.full(len(close), 1000000)  # Placeholder volume
+                })
 
-                print(f"[DEBUG] Processed {len(df)} candles")
-                print(f"[DEBUG] Latest price: ${df['close'].iloc[-1]:,.2f}")
+                logger.debug("Processed %s candles", len(df))
+                logger.debug("Latest price: $%.2f", df['close'].iloc[-1])
 
                 return df
             else:
-                print(f"[DEBUG] CoinGecko error: {response.status_code}")
+                logger.warning("CoinGecko error: %s", response.status_code)
                 if response.text:
-                    print(f"[DEBUG] Error details: {response.text[:500]}")
+                    logger.warning("Error details: %s", response.text[:500])
                 return None
 
         except Exception as e:
-            print(f"[ERROR] Exception fetching CoinGecko data: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Exception fetching CoinGecko data: %s", e)
             return None
 
     def _fetch_mudrex_klines(self, symbol, interval, limit):
         """Fetch from Mudrex API"""
         try:
-            print(f"[DEBUG] Fetching {symbol} from Mudrex...")
-            print(f"[DEBUG] Interval: {interval}, Limit: {limit}")
+            logger.debug("Fetching %s from Mudrex...", symbol)
+            logger.debug("Interval: %s, Limit: %s", interval, limit)
 
             endpoint = f'/candles/{symbol}'
             params = {
@@ -373,55 +616,43 @@ class MarketDataFetcher:
                 candles = response['candles']
 
                 if not candles or len(candles) == 0:
-                    print(f"[DEBUG] Empty data returned from Mudrex")
+                    logger.debug("Empty data returned from Mudrex")
                     return None
 
-                print(f"[DEBUG] Got {len(candles)} candles from Mudrex")
-
-                # Convert to DataFrame
-                df = pd.DataFrame(candles)
-
-                # Rename columns (Mudrex format: time, o, h, l, c, v)
-                df = df.rename(columns={
-                    'time': 'timestamp',
-                    'o': 'open',
-                    'h': 'high',
-                    'l': 'low',
-                    'c': 'close',
-                    'v': 'volume'
-                })
-
-                # Convert timestamp to datetime
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                logger.debug("Got %s candles from Mudrex", len(candles))
 
-                # Convert to numeric
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = pd.to_numeric(df[col])
+                # Parse straight into typed columns (Mudrex format: time, o, h, l, c, v)
+                rows = np.fromiter(
+                    ((int(c['time']), float(c['o']), float(c['h']), float(c['l']),
+                      float(c['c']), float(c['v'])) for c in candles),
+                    dtype=_KLINE_DTYPE, count=len(candles)
+                )
 
-                # Sort by timestamp
-                df = df.sort_values('timestamp').reset_index(drop=True)
+                # Sort by timestamp (Mudrex normally sends them in order already)
+                ts = rows['timestamp']
+                if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+                    rows = rows[np.argsort(ts, kind='stable')]
+                df = _klines_frame(rows)
 
-                print(f"[DEBUG] Processed DataFrame with {len(df)} rows")
-                print(f"[DEBUG] Latest price: ${df['close'].iloc[-1]:,.2f}")
+                logger.debug("Processed DataFrame with %s rows", len(df))
+                logger.debug("Latest price: $%.2f", df['close'].iloc[-1])
 
                 return df
             else:
-                print(f"[DEBUG] Invalid response from Mudrex")
+                logger.debug("Invalid response from Mudrex")
                 return None
 
         except Exception as e:
-            print(f"[ERROR] Exception fetching Mudrex klines: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Exception fetching Mudrex klines: %s", e)
             return None
 
     def _fetch_binance_klines(self, symbol, interval, limit):
         """Fetch from Binance API (fallback)"""
         try:
-            binance_symbol = symbol.replace('/', '').upper()
+            binance_symbol = _binance_symbol(symbol)
 
-            print(f"[DEBUG] Fetching {binance_symbol} from Binance...")
-            print(f"[DEBUG] Interval: {interval}, Limit: {limit}")
+            logger.debug("Fetching %s from Binance...", binance_symbol)
+            logger.debug("Interval: %s, Limit: %s", interval, limit)
 
             url = "https://api.binance.com/api/v3/klines"
             params = {
@@ -430,46 +661,67 @@ class MarketDataFetcher:
                 'limit': limit
             }
 
+            # With enough history cached, only ask for candles from the last
+            # cached one on (it may still have been forming when cached). Only
+            # when everything since then fits in one response: Binance returns
+            # the `limit` candles starting at startTime, which after a long gap
+            # would stop short of now
+            cache_key = (binance_symbol, interval)
+            with self._cache_lock:
+                cached = self._klines_cache.get(cache_key)
+            interval_ms = INTERVAL_SECONDS.get(interval, 0) * 1000
+            if (cached is not None and len(cached[0]) >= limit
+                    and time.time() * 1000 - cached[1] < limit * interval_ms):
+                params['startTime'] = cached[1]
+            else:
+                cached = None
+
             response = self.session.get(url, params=params, timeout=10)
 
-            print(f"[DEBUG] Response status: {response.status_code}")
+            logger.debug("Response status: %s", response.status_code)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
 
                 if not data or len(data) == 0:
-                    print(f"[DEBUG] Empty data returned from Binance")
+                    logger.debug("Empty data returned from Binance")
                     return None
 
-                print(f"[DEBUG] Got {len(data)} candles from Binance")
-
-                df = pd.DataFrame(data, columns=[
-                    'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                    'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                    'taker_buy_quote', 'ignore'
-                ])
-
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df['open'] = df['open'].astype(float)
-                df['high'] = df['high'].astype(float)
-                df['low'] = df['low'].astype(float)
-                df['close'] = df['close'].astype(float)
-                df['volume'] = df['volume'].astype(float)
-
-                df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-
-                print(f"[DEBUG] Processed DataFrame with {len(df)} rows")
-                print(f"[DEBUG] Latest price: ${df['close'].iloc[-1]:,.2f}")
-
-                return df
+                logger.debug("Got %s candles from Binance", len(data))
+
+                # Parse the six columns used straight into typed arrays; Binance
+                # sends prices as strings and six more columns that are dropped
+                rows = np.fromiter(
+                    ((r[0], float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]))
+                     for r in data),
+                    dtype=_KLINE_DTYPE, count=len(data)
+                )
+                df = _klines_frame(rows)
+
+                if cached is not None and rows['timestamp'][0] != cached[1]:
+                    # Not a continuation of the cached candles; fetch in full
+                    with self._cache_lock:
+                        self._klines_cache.pop(cache_key, None)
+                    return self._fetch_binance_klines(symbol, interval, limit)
+
+                if cached is not None:
+                    # Replace the re-fetched last candle and append the new ones
+                    df = pd.concat([cached[0].iloc[:-1], df], ignore_index=True)
+                    df = df.iloc[-limit:].reset_index(drop=True)
+                with self._cache_lock:
+                    self._klines_cache[cache_key] = (df, int(rows['timestamp'][-1]))
+
+                logger.debug("Processed DataFrame with %s rows", len(df))
+                logger.debug("Latest price: $%.2f", df['close'].iloc[-1])
+
+                # Callers may add indicator columns; keep the cached frame clean
+                return df.copy(deep=False)
             else:
-                print(f"[DEBUG] Bad status code: {response.status_code}")
+                logger.warning("Binance bad status code: %s", response.status_code)
                 return None
 
         except Exception as e:
-            print(f"[ERROR] Exception fetching Binance klines: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Exception fetching Binance klines: %s", e)
             return None
 
     def fetch_stock_price(self, symbol, exchange='NSE'):
@@ -482,7 +734,7 @@ class MarketDataFetcher:
         # - Yahoo Finance API
         # - NSE/BSE data providers
         # - Your broker's API
-        print(f"Stock data fetching not implemented for {symbol} on {exchange}")
+        logger.warning("Stock data fetching not implemented for %s on %s", symbol, exchange)
         return None
 
 
@@ -499,6 +751,8 @@ def get_market_data_fetcher():
 
 if __name__ == "__main__":
     # Test the fetcher
+    logging.basicConfig(level=logging.INFO)
+
     fetcher = MarketDataFetcher()
 
     print("Testing Crypto Price Fetch...")
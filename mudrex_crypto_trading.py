@@ -4,16 +4,67 @@ Support for Bitcoin, Ethereum, and other cryptocurrencies
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hmac
 import hashlib
 import time
 import json
+import threading
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from ema_algo_trading import EMAStrategy
+from ema_algo_trading import EMAStrategy, sleep_until_next_candle
+from market_data_fetcher import INTERVAL_SECONDS
+
+# orjson decodes API replies from the raw bytes, skipping requests' charset
+# detection and the stdlib json behind response.json()
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+class _RateLimiter:
+    """
+    Sliding-window request limiter shared by threads
+    
+    acquire() only blocks once max_calls requests have started within the
+    last period seconds, so bursts up to the limit go out immediately.
+    """
+    
+    def __init__(self, max_calls, period=1.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()  # monotonic start times of recent requests
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Wait until another request may start, then record it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
 
 
 class MudrexTrading:
+    # Most API requests started per second, across all threads
+    REQUESTS_PER_SECOND = 20
+    
+    # Rate-limited and server-error replies are retried by _make_request with
+    # a fresh timestamp and signature, doubling the wait each time
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.3
+    
     def __init__(self, api_key, api_secret):
         """
         Initialize Mudrex API connection
@@ -29,23 +80,52 @@ class MudrexTrading:
         self.api_secret = api_secret
         self.base_url = "https://api.mudrex.com/v1"
         
+        # One keep-alive session for every API call instead of a new TCP+TLS
+        # handshake per request. The adapter only retries failed connections;
+        # retrying a status would resend the same signed timestamp outside the
+        # rate limiter, so _make_request handles RETRY_STATUSES itself
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=None,
+                              respect_retry_after_header=False)
+        )
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'X-API-KEY': self.api_key
+        })
+        
+        # HMAC already keyed with the secret; each signature copies it instead
+        # of re-deriving the inner/outer key pads
+        self._hmac_base = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        
+        # Paces concurrent callers (e.g. scan_crypto_signals) under the API limit
+        self._limiter = _RateLimiter(self.REQUESTS_PER_SECOND)
+        
+        # Candle frames by (symbol, interval, limit) -> (frame, epoch expiry);
+        # a frame is reused until its candle closes
+        self._candle_cache = {}
+        self._candle_lock = threading.Lock()
+        
     def _generate_signature(self, timestamp, method, endpoint, body=''):
         """
         Generate HMAC signature for authenticated requests
         """
         message = f"{timestamp}{method}{endpoint}{body}"
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
+        mac = self._hmac_base.copy()
+        mac.update(message.encode('utf-8'))
+        return mac.hexdigest()
+    
+    def close(self):
+        """Close the pooled keep-alive connections"""
+        self.session.close()
     
     def _make_request(self, method, endpoint, params=None, body=None):
         """
         Make authenticated API request to Mudrex
         """
-        timestamp = str(int(time.time() * 1000))
         url = f"{self.base_url}{endpoint}"
         
         # Prepare body
@@ -53,32 +133,52 @@ class MudrexTrading:
         if body:
             body_str = json.dumps(body)
         
-        # Generate signature
-        signature = self._generate_signature(timestamp, method, endpoint, body_str)
+        # The body goes out as the exact string that was signed (Content-Type
+        # is set on the session) instead of requests serializing it a second time
+        data = body_str.encode('utf-8') if body_str else None
         
-        # Headers
-        headers = {
-            'Content-Type': 'application/json',
-            'X-API-KEY': self.api_key,
-            'X-TIMESTAMP': timestamp,
-            'X-SIGNATURE': signature
-        }
-        
-        # Make request
+        # Order POSTs are sent once, so an order is never placed twice
+        attempts = 1 if method == 'POST' else self.MAX_RETRIES + 1
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=body)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, json=body)
+            for attempt in range(attempts):
+                if attempt:
+                    time.sleep(self.RETRY_BACKOFF * 2 ** (attempt - 1))
+                
+                # Wait for a slot first so the signed timestamp is current when sent
+                self._limiter.acquire()
+                
+                timestamp = str(int(time.time() * 1000))
+                
+                # Generate signature
+                signature = self._generate_signature(timestamp, method, endpoint, body_str)
+                
+                # Per-request headers (the API key is set on the session)
+                headers = {
+                    'X-TIMESTAMP': timestamp,
+                    'X-SIGNATURE': signature
+                }
+                
+                # Make request
+                if method == 'GET':
+                    response = self.session.get(url, headers=headers, params=params)
+                elif method == 'POST':
+                    response = self.session.post(url, headers=headers, data=data)
+                elif method == 'DELETE':
+                    response = self.session.delete(url, headers=headers, data=data)
+                
+                if response.status_code not in self.RETRY_STATUSES:
+                    break
             
             response.raise_for_status()
-            return response.json()
+            return _json_loads(response.content)
             
         except requests.exceptions.RequestException as e:
             print(f"✗ API Request Error: {str(e)}")
             return None
+        except ValueError as e:
+            # Body was not valid JSON (response.json() reported this as a RequestException)
+            print(f"✗ API Request Error: invalid JSON response ({e})")
+            return None
     
     def get_account_balance(self):
         """
@@ -123,7 +223,17 @@ class MudrexTrading:
         Returns:
         --------
         pandas.DataFrame with columns: timestamp, open, high, low, close, volume
+        
+        Repeat calls before the current candle closes (e.g. back-to-back
+        scans) are served from memory, as shallow copies.
         """
+        key = (symbol, interval, limit)
+        now = time.time()
+        with self._candle_lock:
+            cached = self._candle_cache.get(key)
+        if cached is not None and now < cached[1]:
+            return cached[0].copy(deep=False)
+        
         endpoint = f'/candles/{symbol}'
         params = {
             'interval': interval,
@@ -154,11 +264,17 @@ class MudrexTrading:
             for col in ['open', 'high', 'low', 'close', 'volume']:
                 df[col] = pd.to_numeric(df[col])
             
-            # Sort by timestamp
-            df = df.sort_values('timestamp').reset_index(drop=True)
+            # Sort by timestamp, unless the candles already arrived in order
+            ts = df['timestamp'].to_numpy()
+            if len(ts) > 1 and (ts[1:] < ts[:-1]).any():
+                df = df.sort_values('timestamp').reset_index(drop=True)
             
             print(f"✓ Fetched {len(df)} candles for {symbol}")
-            return df
+            
+            period = INTERVAL_SECONDS.get(interval, 60)
+            with self._candle_lock:
+                self._candle_cache[key] = (df, (now // period + 1) * period)
+            return df.copy(deep=False)
         
         print(f"✗ Failed to fetch data for {symbol}")
         return None
@@ -287,6 +403,43 @@ class MudrexTrading:
 # Crypto Trading Bot Implementation
 # ==========================================
 
+# Candles requested per cycle once the trading window is loaded
+ROLL_FETCH_LIMIT = 5
+
+
+def _roll_candles(window, latest, limit):
+    """
+    Roll newly fetched candles onto the trading window
+    
+    Parameters:
+    -----------
+    window : pandas.DataFrame
+        Current candle window, oldest first
+    latest : pandas.DataFrame
+        Most recent candles, oldest first
+    limit : int
+        Candles to keep
+    
+    Returns:
+    --------
+    pandas.DataFrame of the last limit candles, or None if latest does not
+    overlap the window and it has to be fetched again in full
+    """
+    if len(latest) == 0:
+        return None
+    
+    last_ts = window['timestamp'].iloc[-1]
+    if latest['timestamp'].iloc[0] > last_ts:
+        return None
+    
+    # The window's last candle may still have been forming; take it fresh
+    newer = latest[latest['timestamp'] >= last_ts]
+    if len(newer) == 0:
+        return window
+    merged = pd.concat([window.iloc[:-1], newer], ignore_index=True)
+    return merged.iloc[-limit:].reset_index(drop=True)
+
+
 def run_crypto_trading(api_key, api_secret, symbol='BTC/USDT', 
                        capital=10000, risk_per_trade=0.02):
     """
@@ -318,26 +471,42 @@ def run_crypto_trading(api_key, api_secret, symbol='BTC/USDT',
     # Initialize strategy
     strategy = EMAStrategy(capital=capital, risk_per_trade=risk_per_trade)
     
-    print(f"\n{'='*60}")
-    print(f"Starting Crypto Trading Bot")
-    print(f"Symbol: {symbol}")
-    print(f"Capital: ${capital} USDT")
-    print(f"Risk per Trade: {risk_per_trade*100}%")
-    print(f"{'='*60}\n")
+    print(
+        f"\n{'='*60}\n"
+        f"Starting Crypto Trading Bot\n"
+        f"Symbol: {symbol}\n"
+        f"Capital: ${capital} USDT\n"
+        f"Risk per Trade: {risk_per_trade*100}%\n"
+        f"{'='*60}\n"
+    )
     
     # Track orders
     entry_order_id = None
     sl_order_id = None
     target_order_id = None
     
+    data = None
+    
     try:
         while True:
-            # Fetch latest 5-minute candles
-            data = mudrex.fetch_historical_data(
-                symbol=symbol,
-                interval='5m',
-                limit=200
-            )
+            # Fetch the full 200-candle window once, then only the newest
+            # 5-minute candles each cycle, rolled onto the window
+            if data is not None and len(data) >= 30:
+                latest = mudrex.fetch_historical_data(
+                    symbol=symbol,
+                    interval='5m',
+                    limit=ROLL_FETCH_LIMIT
+                )
+                rolled = _roll_candles(data, latest, 200) if latest is not None else None
+                # No overlap with the window (e.g. after an outage): refetch it all
+                data = rolled
+            
+            if data is None:
+                data = mudrex.fetch_historical_data(
+                    symbol=symbol,
+                    interval='5m',
+                    limit=200
+                )
             
             if data is None or len(data) < 30:
                 print("Insufficient data. Waiting...")
@@ -402,7 +571,7 @@ def run_crypto_trading(api_key, api_secret, symbol='BTC/USDT',
                     min_quantity = 0.001  # Adjust based on exchange
                     if quantity < min_quantity:
                         print(f"Quantity too small: {quantity}. Skipping...")
-                        time.sleep(300)
+                        sleep_until_next_candle(300)
                         continue
                     
                     if signal == 'BUY':
@@ -444,7 +613,7 @@ def run_crypto_trading(api_key, api_secret, symbol='BTC/USDT',
             
             # Wait for next candle (5 minutes)
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Monitoring {symbol}...")
-            time.sleep(300)
+            sleep_until_next_candle(300)
             
     except KeyboardInterrupt:
         print("\n\nStopping crypto trading...")
@@ -458,6 +627,9 @@ def run_crypto_trading(api_key, api_secret, symbol='BTC/USDT',
         print(f"\n✗ Error in crypto trading: {str(e)}")
         import traceback
         traceback.print_exc()
+    
+    finally:
+        mudrex.close()
 
 
 # ==========================================
@@ -485,9 +657,23 @@ def get_top_crypto_pairs(mudrex):
     return usdt_pairs
 
 
-def scan_crypto_signals(mudrex, pairs=['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT']):
+def scan_crypto_signals(mudrex, pairs=['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT'],
+                        max_workers=4):
     """
     Scan multiple crypto pairs for trading signals
+    
+    Candles for all pairs are fetched concurrently through the Mudrex client,
+    which paces requests and backs off on 429s; signals are then checked in pair
+    order on this thread, since the strategy keeps per-frame state.
+    
+    Parameters:
+    -----------
+    mudrex : MudrexTrading
+        Connected Mudrex client
+    pairs : list of str
+        Crypto pairs to scan
+    max_workers : int
+        Most candle requests in flight at once
     """
     strategy = EMAStrategy(capital=10000)
     signals_found = []
@@ -495,10 +681,16 @@ def scan_crypto_signals(mudrex, pairs=['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/
     print(f"\nScanning {len(pairs)} crypto pairs for signals...")
     print("=" * 60)
     
-    for symbol in pairs:
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pairs)))) as pool:
+        futures = [
+            pool.submit(mudrex.fetch_historical_data, symbol, interval='5m', limit=100)
+            for symbol in pairs
+        ]
+    
+    for symbol, future in zip(pairs, futures):
         try:
             # Fetch data
-            data = mudrex.fetch_historical_data(symbol, interval='5m', limit=100)
+            data = future.result()
             
             if data is None or len(data) < 30:
                 continue
@@ -524,8 +716,6 @@ def scan_crypto_signals(mudrex, pairs=['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/
         except Exception as e:
             print(f"Error scanning {symbol}: {str(e)}")
             continue
-        
-        time.sleep(1)  # Rate limiting
     
     if not signals_found:
         print("\n❌ No signals found at this time")
@@ -4,10 +4,32 @@ Test strategies without risking real money
 """
 
 import pandas as pd
+import time
 from datetime import datetime
-from ema_algo_trading import EMAStrategy
+from ema_algo_trading import EMAStrategy, sleep_until_next_candle
 from database_handler import TradingDatabase
 
+# Trade event reports, each printed with a single call
+_RULE = '=' * 60
+_EXECUTED_TEMPLATE = (
+    "\n" + _RULE + "\n"
+    "📝 PAPER TRADE EXECUTED: {signal}\n"
+    "Symbol: {symbol}\n"
+    "Entry: ₹{price:.2f} | Quantity: {quantity}\n"
+    "Stop Loss: ₹{stop_loss:.2f} | Target: ₹{target:.2f}\n"
+    "Capital Remaining: ₹{capital:.2f}\n"
+    + _RULE + "\n"
+)
+_CLOSED_TEMPLATE = (
+    "\n" + _RULE + "\n"
+    "📝 PAPER TRADE CLOSED: {signal}\n"
+    "Entry: ₹{entry_price:.2f} | Exit: ₹{exit_price:.2f}\n"
+    "P&L: ₹{pnl:.2f} ({pnl_percent:+.2f}%)\n"
+    "Reason: {reason}\n"
+    "Capital: ₹{capital:.2f} (Initial: ₹{initial_capital:.2f})\n"
+    + _RULE + "\n"
+)
+
 
 class PaperTradingSimulator:
     def __init__(self, initial_capital=10000, risk_per_trade=0.02):
@@ -26,6 +48,7 @@ class PaperTradingSimulator:
         self.strategy = EMAStrategy(capital=initial_capital, risk_per_trade=risk_per_trade)
         self.db = TradingDatabase()
         self.current_trade = None
+        self._entry_monotonic = None  # time.monotonic() at the current trade's entry
         
     def fetch_live_data(self, symbol, exchange='NSE'):
         """
@@ -92,15 +115,14 @@ class PaperTradingSimulator:
             'reason': None,
             'mode': 'paper',
             'indicators': {
-                'ema9': float(data['ema9'].iloc[-1]) if 'ema9' in data else None,
-                'ema15': float(data['ema15'].iloc[-1]) if 'ema15' in data else None,
-                'rsi': float(data['rsi'].iloc[-1]) if 'rsi' in data else None,
-                'macd': float(data['macd'].iloc[-1]) if 'macd' in data else None,
+                key: self.strategy.last_indicators.get(key)
+                for key in ('ema9', 'ema15', 'rsi', 'macd')
             }
         }
         
         # Update capital
         self.capital -= trade_value
+        self._entry_monotonic = time.monotonic()
         
         # Save to database
         self.db.insert_trade(trade_data)
@@ -113,13 +135,10 @@ class PaperTradingSimulator:
         
         self.current_trade = trade_data
         
-        print(f"\n{'='*60}")
-        print(f"📝 PAPER TRADE EXECUTED: {signal}")
-        print(f"Symbol: {symbol}")
-        print(f"Entry: ₹{current_price:.2f} | Quantity: {quantity}")
-        print(f"Stop Loss: ₹{stop_loss:.2f} | Target: ₹{target:.2f}")
-        print(f"Capital Remaining: ₹{self.capital:.2f}")
-        print(f"{'='*60}\n")
+        print(_EXECUTED_TEMPLATE.format(
+            signal=signal, symbol=symbol, price=current_price, quantity=quantity,
+            stop_loss=stop_loss, target=target, capital=self.capital
+        ))
         
         return True
     
@@ -149,10 +168,10 @@ class PaperTradingSimulator:
         
         pnl_percent = (pnl / (entry_price * quantity)) * 100
         
-        # Calculate holding time
-        entry_time = datetime.strptime(self.current_trade['entry_time'], '%Y-%m-%d %H:%M:%S')
+        # Calculate holding time from the monotonic clock read at entry,
+        # rather than parsing entry_time back out of its string
         exit_time = datetime.now()
-        holding_time = int((exit_time - entry_time).total_seconds() / 60)
+        holding_time = int((time.monotonic() - self._entry_monotonic) / 60)
         
         # Update trade record
         trade_update = {
@@ -169,15 +188,7 @@ class PaperTradingSimulator:
         self.capital += (entry_price * quantity) + pnl
         
         # Save to database
-        conn = self.db.connect()
-        cursor = conn.cursor()
-        
-        set_clause = ', '.join([f"{key} = ?" for key in trade_update.keys()])
-        query = f"UPDATE trades SET {set_clause} WHERE trade_id = ?"
-        
-        cursor.execute(query, list(trade_update.values()) + [self.current_trade['trade_id']])
-        conn.commit()
-        self.db.close()
+        self.db.update_trade(self.current_trade['trade_id'], trade_update)
         
         # Reset strategy state
         self.strategy.position = None
@@ -185,13 +196,11 @@ class PaperTradingSimulator:
         self.strategy.stop_loss = 0
         self.strategy.target = 0
         
-        print(f"\n{'='*60}")
-        print(f"📝 PAPER TRADE CLOSED: {self.current_trade['signal_type']}")
-        print(f"Entry: ₹{entry_price:.2f} | Exit: ₹{exit_price:.2f}")
-        print(f"P&L: ₹{pnl:.2f} ({pnl_percent:+.2f}%)")
-        print(f"Reason: {reason}")
-        print(f"Capital: ₹{self.capital:.2f} (Initial: ₹{self.initial_capital:.2f})")
-        print(f"{'='*60}\n")
+        print(_CLOSED_TEMPLATE.format(
+            signal=self.current_trade['signal_type'], entry_price=entry_price,
+            exit_price=exit_price, pnl=pnl, pnl_percent=pnl_percent, reason=reason,
+            capital=self.capital, initial_capital=self.initial_capital
+        ))
         
         self.current_trade = None
         
@@ -199,11 +208,7 @@ class PaperTradingSimulator:
     
     def get_account_status(self):
         """Get current account status"""
-        open_trades = self.db.get_all_trades(mode='paper')
-        open_trades = open_trades[open_trades['status'] == 'OPEN']
-        
-        used_capital = sum([row['entry_price'] * row['quantity'] 
-                           for _, row in open_trades.iterrows()])
+        open_positions, used_capital = self.db.get_open_exposure('paper')
         
         return {
             'initial_capital': self.initial_capital,
@@ -214,7 +219,7 @@ class PaperTradingSimulator:
             'pnl': (self.capital + used_capital) - self.initial_capital,
             'pnl_percent': ((self.capital + used_capital - self.initial_capital) / 
                            self.initial_capital * 100),
-            'open_positions': len(open_trades)
+            'open_positions': open_positions
         }
 
 
@@ -240,8 +245,6 @@ def run_paper_trading(symbol='SBIN', exchange='NSE', capital=10000):
     print(f"This is simulated trading - No real money involved!")
     print(f"{'='*60}\n")
     
-    import time
-    
     try:
         while True:
             # In production, fetch real market data
@@ -254,7 +257,7 @@ def run_paper_trading(symbol='SBIN', exchange='NSE', capital=10000):
             # 3. Execute paper trades
             # 4. Monitor positions
             
-            time.sleep(300)  # Wait 5 minutes
+            sleep_until_next_candle(300)  # Wait for the next 5-minute candle
             
     except KeyboardInterrupt:
         print("\n\nStopping paper trading...")
@@ -7,19 +7,39 @@ import argparse
 import sys
 import time
 import logging
+import logging.handlers
+import queue
+import atexit
+import traceback
 from datetime import datetime
+import numpy as np
+import pandas as pd
+from ema_algo_trading import EMAStrategy, sleep_until_next_candle
+from market_data_fetcher import MarketDataFetcher
 from paper_trading import run_paper_trading
 from config_manager import ConfigManager
 
-# Setup logging
+# Setup logging. The loop only enqueues records; a background listener
+# formats them and writes the file and console, so logging never blocks the
+# trading loop on I/O (timestamps are taken when the record is created)
+_log_handlers = [
+    logging.FileHandler('bot.log'),
+    logging.StreamHandler(sys.stdout)
+]
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
+                                   datefmt='%Y-%m-%d %H:%M:%S')
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drains the queue before exit
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    format='%(message)s',  # Only merges args; the listener's handlers add the rest
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 
 logger = logging.getLogger(__name__)
@@ -66,21 +86,38 @@ def main():
         logger.info("\nPaper trading stopped by user")
     except Exception as e:
         logger.error(f"Error in paper trading: {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
     finally:
         logger.info("Paper trading session ended")
 
 
+def _wait_for_next_poll(fetcher, live_crypto):
+    """
+    Sleep until the paper trading loop should poll again
+    
+    Parameters:
+    -----------
+    fetcher : MarketDataFetcher
+        Market data source of the loop
+    live_crypto : bool
+        True when the loop trades real crypto candles over REST
+    """
+    # WebSocket mode: Check every 5 seconds for fast response (data updates every second)
+    # REST API mode: Wake just after the next 5-minute candle close; the
+    # klines cache returns the same candles until then
+    # Simulation: A new simulated candle every 60 seconds
+    if fetcher.use_websocket:
+        time.sleep(5)
+    elif live_crypto:
+        sleep_until_next_candle(300)
+    else:
+        time.sleep(60)
+
+
 def simulate_paper_trading(symbol, capital, risk, crypto=False):
     """
     Paper trading with REAL market data from exchanges
     """
-    from ema_algo_trading import EMAStrategy
-    from market_data_fetcher import MarketDataFetcher
-    import pandas as pd
-    import numpy as np
-
     logger.info(f"Initializing paper trading bot...")
     logger.info(f"💰 Starting Capital: ${capital:,.2f}")
     logger.info(f"⚠️  Risk per Trade: {risk*100}%")
@@ -128,11 +165,15 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
     iteration = 0
     trades_count = 0
     last_price = None
+    last_bar = None  # (timestamp, close) of the last row already evaluated
+    # Local generator for the simulated feed, leaving numpy's global
+    # RandomState untouched
+    rng = np.random.default_rng(int(time.time()) % 10000)
+    noise_buf = np.empty(3 * 100)  # open/high/low noise, refilled in place
 
     while iteration < 1000:
         try:
             iteration += 1
-            current_time = datetime.now().strftime('%H:%M:%S')
 
             # Fetch fresh data from CoinGecko
             if use_real_data and crypto:
@@ -151,15 +192,13 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
                     base_price = 3000 if symbol.startswith('ETH') else 50000 if symbol.startswith('BTC') else 100
                     prices = []
                     timestamps = []
-                    np.random.seed(int(time.time()) % 10000)
-
                     for i in range(50):
-                        change = np.random.randn() * (base_price * 0.01)
+                        change = rng.standard_normal() * (base_price * 0.01)
                         base_price = max(base_price + change, base_price * 0.5)
                         prices.append(base_price)
                         timestamps.append(datetime.now())
 
-                price_change_pct = np.random.randn() * 0.5
+                price_change_pct = rng.standard_normal() * 0.5
                 price_change = base_price * (price_change_pct / 100)
                 base_price = max(base_price + price_change, base_price * 0.8)
 
@@ -170,30 +209,38 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
                     prices = prices[-100:]
                     timestamps = timestamps[-100:]
 
+                # Draw each column's noise as one array instead of per price,
+                # into the reused buffer (rows fill in the same order as three
+                # separate draws)
+                close = np.asarray(prices, dtype=np.float64)
+                n = len(close)
+                noise = noise_buf[:3 * n].reshape(3, n)
+                rng.standard_normal(out=noise)
                 df = pd.DataFrame({
                     'timestamp': timestamps,
-                    'close': prices,
-                    'open': [p * (1 + np.random.randn() * 0.001) for p in prices],
-                    'high': [p * (1 + abs(np.random.randn() * 0.005)) for p in prices],
-                    'low': [p * (1 - abs(np.random.randn() * 0.005)) for p in prices],
-                    'volume': [np.random.randint(1000, 10000) for _ in prices]
+                    'close': close,
+                    'open': close * (1 + noise[0] * 0.001),
+                    'high': close * (1 + np.abs(noise[1] * 0.005)),
+                    'low': close * (1 - np.abs(noise[2] * 0.005)),
+                    'volume': rng.integers(1000, 10000, n)
                 })
 
-            # Calculate indicators
-            df['ema_9'] = df['close'].ewm(span=9, adjust=False).mean()
-            df['ema_15'] = df['close'].ewm(span=15, adjust=False).mean()
-
-            # Calculate RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
+            # An unchanged last row (same candle, same price) would give the
+            # same indicators and signals as the previous pass, so skip ahead
+            bar = (df['timestamp'].iloc[-1], df['close'].iloc[-1])
+            if bar == last_bar:
+                _wait_for_next_poll(fetcher, use_real_data and crypto)
+                continue
+            last_bar = bar
+
+            # Calculate indicators with the strategy's compiled kernels; the
+            # EMAs are memoized for this frame, so the signal checks below
+            # reuse them instead of computing them again
+            ema_9 = strategy.calculate_ema(df, 9)[-1]
+            ema_15 = strategy.calculate_ema(df, 15)[-1]
+            rsi = strategy.calculate_rsi(df)[-1]
 
             current_price = df['close'].iloc[-1]
-            ema_9 = df['ema_9'].iloc[-1]
-            ema_15 = df['ema_15'].iloc[-1]
-            rsi = df['rsi'].iloc[-1]
 
             # Calculate price change
             if last_price is not None:
@@ -209,7 +256,9 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
             # or every 5 iterations when simulating (every ~2.5 minutes)
             log_frequency = 1 if use_real_data else 5
 
-            if iteration % log_frequency == 0:
+            # The update block is only formatted when INFO is actually logged
+            if iteration % log_frequency == 0 and logger.isEnabledFor(logging.INFO):
+                current_time = time.strftime('%H:%M:%S')
                 data_source = "🌐 LIVE DATA" if use_real_data else "📊 SIMULATED"
                 logger.info(f"⏰ [{current_time}] Market Update ({data_source}):")
                 logger.info(f"   💵 Price: ${current_price:,.2f} ({price_change:+.2f}, {price_change_pct:+.2f}%)")
@@ -263,10 +312,7 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
                     logger.info("")
 
             # Wait before next iteration
-            # WebSocket mode: Check every 5 seconds for fast response (data updates every second)
-            # REST API mode: Check every 60 seconds (CoinGecko updates every 5 min)
-            sleep_time = 5 if fetcher.use_websocket else 60
-            time.sleep(sleep_time)
+            _wait_for_next_poll(fetcher, use_real_data and crypto)
 
         except KeyboardInterrupt:
             logger.info("")
@@ -274,7 +320,6 @@ def simulate_paper_trading(symbol, capital, risk, crypto=False):
             break
         except Exception as e:
             logger.error(f"❌ Error in trading loop: {str(e)}")
-            import traceback
             logger.error(traceback.format_exc())
             time.sleep(60)
 
@@ -0,0 +1,96 @@
+"""
+UI Helpers
+Streamlit pieces shared by the app (app.py) and the dashboard (dashboard.py)
+"""
+
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+import hashlib
+import json
+
+
+# st.fragment (Streamlit >= 1.37) reruns only the decorated block on interaction
+fragment = getattr(st, 'fragment', lambda func: func)
+
+# Columns and formats for the recent trades table
+DISPLAY_COLS = ('timestamp', 'symbol', 'signal_type', 'entry_price',
+                'exit_price', 'pnl', 'pnl_percent', 'reason')
+DISPLAY_FORMAT = {
+    'entry_price': '₹{:.2f}',
+    'exit_price': '₹{:.2f}',
+    'pnl': '₹{:.2f}',
+    'pnl_percent': '{:+.2f}%'
+}
+
+
+def plotly_chart_cached(key, y_values, build_figure, *extra):
+    """
+    Render a Plotly figure, reusing its serialized JSON across reruns
+
+    The figure is rebuilt only when the hash of the plotted values
+    (plus any extra inputs such as x values or capital) changes.
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    hasher.update(np.ascontiguousarray(y_values, dtype=np.float64).tobytes())
+    for value in extra:
+        hasher.update(repr(value).encode('utf-8'))
+    digest = hasher.hexdigest()
+
+    cached = st.session_state.get(key)
+    if cached is not None and cached[0] == digest:
+        fig_json = cached[1]
+    else:
+        fig_json = build_figure().to_json()
+        st.session_state[key] = (digest, fig_json)
+
+    st.plotly_chart(json.loads(fig_json), use_container_width=True)
+
+
+@fragment
+def show_equity_curve(db, mode):
+    """
+    Equity curve for a mode, rendered only once the user asks for it
+
+    Parameters:
+    -----------
+    db : TradingDatabase
+        Database holding the trades
+    mode : str
+        Trading mode ('live', 'paper' or 'backtest')
+    """
+    # Plotly serialization is the heaviest part of the view, so it is opt-in
+    if not st.toggle("📈 Show Equity Curve", key=f"show_equity_{mode}"):
+        return
+
+    # A fragment rerun skips the caller's closed-trades check
+    rows = db.get_equity_points(mode, limit=20)
+    if not rows:
+        st.info("No closed trades yet")
+        return
+    exit_times, pnls = zip(*((r['exit_time'], r['pnl']) for r in rows))
+    equity = 10000 + np.cumsum(np.asarray(pnls, dtype=np.float64))
+
+    def build_equity_figure():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=exit_times,
+            y=equity,
+            mode='lines+markers',
+            name='Equity',
+            line=dict(color='blue', width=2)
+        ))
+
+        fig.add_hline(y=10000, line_dash="dash", line_color="gray",
+                     annotation_text="Initial Capital")
+
+        fig.update_layout(
+            title="Account Equity Over Time",
+            xaxis_title="Date",
+            yaxis_title="Equity (₹)",
+            hovermode='x unified',
+            height=400
+        )
+        return fig
+
+    plotly_chart_cached(f'equity_fig_{mode}', equity, build_equity_figure, exit_times)